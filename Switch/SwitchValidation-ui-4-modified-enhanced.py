@@ -1,16 +1,27 @@
 import os
+import re
 import sys
 import csv
 import json
 import time
 import glob
-import queue
+import bisect
 import threading
+import traceback
 import subprocess
 import platform
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import xml.etree.ElementTree as ET
+from switch_engine import (
+    XPATH_SWITCH, VALIDATION_FIELDS, SwitchXmlIndex, XmlFieldCache, default_workers,
+    iter_switch_fields, check_csv_headers, run_validation, run_validation_matrix, unique_stamp,
+)
+from switch_catalog import (
+    CATALOG_FIELDS, SwitchCatalog, ValidationState, open_catalog_view, open_ref_view, open_ref_views, xml_tree_id,
+    plan_revalidation, record_validation,
+)
+import repo_meta
 
 # ----------------------------- Constants and paths -----------------------------
 APP_TITLE = "Git & FUT Switch Validator"
@@ -19,15 +30,22 @@ CURRENT_DIR = os.getcwd()
 PARENT_DIR = os.path.dirname(CURRENT_DIR)
 RESULTS_DIR = os.path.join(SCRIPT_DIR, "results")
 LOGS_DIR = os.path.join(SCRIPT_DIR, "logs")
+CACHE_DIR = os.path.join(SCRIPT_DIR, "cache")
 SETTINGS_PATH = os.path.join(SCRIPT_DIR, "user_settings.json")
 os.makedirs(RESULTS_DIR, exist_ok=True)
 os.makedirs(LOGS_DIR, exist_ok=True)
 BRANCH_CONFIG = os.path.join(SCRIPT_DIR, "branch_config.json")
-REQUIRED_HEADERS = ["ADO Reference", "Release", "Switch Name", "Divisions", "Value", "Status"]
-
-# XML XPaths
-XPATH_REFERENCE = "./ListOfVfFutSwitchIo/VfFutSwitchBc/Reference"
-XPATH_SWITCH = "./ListOfVfFutSwitchIo/VfFutSwitchBc/Switch"
+PROGRESS_MAX_LINES = 2000   # lines kept in the progress console; the session log has them all
+PROGRESS_LOG_PATH = os.path.join(LOGS_DIR, f"progress_session_{time.strftime('%Y%m%d_%H%M%S')}.log")
+PROGRESS_LOG_KEEP = 20      # session logs kept in logs/, this one included
+ITEM_LINE = re.compile(r"^\[\d+/\d+\] ")  # per-file / per-row lines: "[12/340] ..."
+
+# Parsed XML fields survive across runs; shared by validate, search and generate
+xml_cache = XmlFieldCache(os.path.join(CACHE_DIR, "xml_fields_cache.sqlite"))
+# Extracted switches per git tree of the XML folder; makes revisited branches instant
+switch_catalog = SwitchCatalog(os.path.join(CACHE_DIR, "switch_catalog.sqlite"))
+# Commit each CSV was last validated against, for incremental reruns
+validation_state = ValidationState(os.path.join(CACHE_DIR, "validation_state.json"))
 
 # ----------------------------- Tk root and styling -----------------------------
 root = tk.Tk()
@@ -92,6 +110,10 @@ ado_num_var = tk.StringVar()
 modified_by_var = tk.StringVar()
 search_repo_var = tk.StringVar()
 logging_enabled = tk.BooleanVar(value=False)
+parallel_enabled = tk.BooleanVar(value=True)
+incremental_enabled = tk.BooleanVar(value=True)
+progress_verbosity = tk.StringVar(value="All")  # "All" | "Failures + summary"
+validate_ref_var = tk.StringVar()  # empty: working tree; else a git ref read from objects
 current_branch = tk.StringVar(value="N/A")
 search_switch_var = tk.StringVar()
 search_result_var = tk.StringVar()
@@ -102,12 +124,10 @@ search_file_path_var = tk.StringVar()
 # Run/Thread state
 is_running = tk.BooleanVar(value=False)
 cancel_event = threading.Event()
-ui_queue = queue.Queue()  # for thread-safe UI updates
 
 # Results filtering
 status_filter_var = tk.StringVar(value="All")  # "All" | "VALIDATED" | "FAILED"
 results_search_var = tk.StringVar()            # text filter
-_all_rows = []                                 # cache of displayed rows for filtering
 
 # ----------------------------- Utility funcs -----------------------------
 def ts():
@@ -134,15 +154,56 @@ def run_cmd(args, cwd=None, shell=False, timeout=120):
     except subprocess.TimeoutExpired:
         return (False, f"Timed out after {timeout}s: {args}")
 
+def stream_cmd(args, cwd=None, on_line=None, cancel=None):
+    """
+    Run a command, calling on_line(text, partial) for each line of output as it
+    arrives. partial=True marks a carriage-return update (git --progress
+    percentages) that replaces the previous partial line. Setting `cancel`
+    kills the child. Returns (ok, output) like run_cmd.
+    """
+    try:
+        proc = subprocess.Popen(args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    except OSError as e:
+        return (False, str(e))
+
+    def watch():
+        while proc.poll() is None:
+            if cancel.wait(0.2):
+                proc.kill()
+                return
+    if cancel is not None:
+        threading.Thread(target=watch, daemon=True).start()
+
+    lines, pending = [], b""
+    while True:
+        chunk = proc.stdout.read1(4096) if hasattr(proc.stdout, "read1") else proc.stdout.read(4096)
+        if not chunk:
+            break
+        pending += chunk
+        while True:
+            m = re.search(rb"\r\n|\r|\n", pending)
+            if not m or (m.group() == b"\r" and m.end() == len(pending)):
+                break  # a lone trailing \r may be the start of \r\n
+            text = pending[:m.start()].decode("utf-8", errors="replace")
+            pending = pending[m.end():]
+            partial = m.group() == b"\r"
+            if not partial:
+                lines.append(text)
+            if on_line:
+                on_line(text, partial)
+    if pending:
+        text = pending.decode("utf-8", errors="replace")
+        lines.append(text)
+        if on_line:
+            on_line(text, False)
+    proc.wait()
+    if cancel is not None and cancel.is_set():
+        return (False, "\n".join(lines + ["Cancelled."]))
+    return (proc.returncode == 0, "\n".join(lines))
+
 def find_git_repos():
-    if not os.path.isdir(PARENT_DIR):
-        return []
-    repos = []
-    for f in os.listdir(PARENT_DIR):
-        p = os.path.join(PARENT_DIR, f)
-        if os.path.isdir(p) and os.path.isdir(os.path.join(p, ".git")):
-            repos.append(f)
-    return sorted(repos)
+    # cached until PARENT_DIR changes; filter_repos calls this on every keystroke
+    return repo_meta.find_git_repos(PARENT_DIR)
 
 def filter_repos(term):
     all_repos = find_git_repos()
@@ -152,10 +213,7 @@ def filter_repos(term):
     return [r for r in all_repos if term_low in r.lower()]
 
 def get_current_branch(repo_path):
-    ok, out = run_cmd(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=repo_path)
-    if ok:
-        return out.strip()
-    return "Unknown"
+    return repo_meta.current_branch(repo_path)
 
 def load_branches_from_config():
     try:
@@ -246,38 +304,119 @@ def on_repo_changed(event=None):
     set_branch_default_from_current()
 
 # ----------------------------- Thread-safe UI bus -----------------------------
-def ui_post(payload: dict):
-    ui_queue.put(payload)
+UI_FRAME_MS = 50         # 20 FPS
+UI_MAX_PENDING = 2000    # workers wait once this many rows/lines are queued
 
-def ui_pump():
-    """Process queued UI updates from worker threads."""
-    try:
-        while True:
-            payload = ui_queue.get_nowait()
-            t = payload.get("type")
+class UiBus:
+    """
+    Coalesces worker events into one batch per frame. Progress lines and result
+    rows between two control events ("clear_results", "running", "git_output", "call")
+    are grouped so each widget gets one update per frame; status text and the
+    progressbar only keep their latest value. Posting from a worker blocks while
+    UI_MAX_PENDING events are waiting, so the UI never falls minutes behind.
+    """
+    def __init__(self, max_pending=UI_MAX_PENDING):
+        self._cond = threading.Condition()
+        self._max_pending = max_pending
+        self._steps = []
+        self._pending = 0
+        self._status = None
+        self._percent = None
+
+    def _data_step(self):
+        if not self._steps or self._steps[-1][0] != "data":
+            self._steps.append(("data", {"progress": [], "rows": [], "git": []}))
+        return self._steps[-1][1]
+
+    def post(self, payload):
+        t = payload.get("type")
+        with self._cond:
+            if threading.current_thread() is not threading.main_thread():
+                while self._pending >= self._max_pending:
+                    self._cond.wait(0.5)
             if t == "progress":
-                _append_progress_ui(payload["msg"], payload.get("ok", True))
-            elif t == "git_output":
-                _show_output_ui(payload["msg"], payload.get("success", True))
-            elif t == "status":
-                status_label.config(text=payload["msg"])
+                self._data_step()["progress"].append((payload["msg"], payload.get("ok", True)))
+                self._pending += 1
             elif t == "result_row":
-                _append_result_row_ui(payload["row"], payload.get("tag"))
-            elif t == "clear_results":
-                for i in results_tree.get_children():
-                    results_tree.delete(i)
-            elif t == "running":
-                _set_running_ui(payload["running"])
+                self._data_step()["rows"].append((payload["row"], payload.get("tag")))
+                self._pending += 1
+            elif t == "git_line":
+                self._data_step()["git"].append((payload["msg"], payload.get("ok", True), payload.get("partial", False)))
+                self._pending += 1
+            elif t == "status":
+                self._status = payload["msg"]
             elif t == "progressbar":
-                progressbar['value'] = payload.get("value", 0)
-    except queue.Empty:
-        pass
-    root.after(50, ui_pump)  # 20 FPS
+                self._percent = payload.get("value", 0)
+            else:
+                if t == "running":
+                    self._percent = None  # the reset done by set_running(False) wins
+                self._steps.append((t, payload))
+
+    def drain(self):
+        """Take everything queued so far: (steps, latest status, latest percent)."""
+        with self._cond:
+            batch = (self._steps, self._status, self._percent)
+            self._steps, self._status, self._percent = [], None, None
+            self._pending = 0
+            self._cond.notify_all()
+        return batch
+
+ui_bus = UiBus()
+
+def ui_post(payload: dict):
+    ui_bus.post(payload)
+
+def ui_call(fn):
+    """Run fn() on the Tk thread, in order with the other posted events."""
+    if threading.current_thread() is threading.main_thread():
+        fn()
+    else:
+        ui_post({"type": "call", "fn": fn})
+
+def _apply_ui_step(t, payload):
+    if t == "data":
+        if payload["progress"]:
+            _append_progress_batch_ui(payload["progress"])
+        if payload["rows"]:
+            results_view.extend(payload["rows"])
+        if payload["git"]:
+            _append_git_batch_ui(payload["git"])
+    elif t == "git_output":
+        _show_output_ui(payload["msg"], payload.get("success", True))
+    elif t == "clear_results":
+        results_view.clear()
+    elif t == "running":
+        _set_running_ui(payload["running"])
+    elif t == "call":
+        payload["fn"]()
+
+def ui_pump():
+    """Apply the batch queued by worker threads since the last frame."""
+    try:
+        steps, status, percent = ui_bus.drain()
+        # one failing event (a bad "call", a destroyed widget) must not drop the rest of the batch
+        for t, payload in steps:
+            try:
+                _apply_ui_step(t, payload)
+            except Exception:
+                _write_progress_log([(f"UI update '{t}' failed:\n{traceback.format_exc()}", False)])
+        try:
+            if status is not None:
+                status_label.config(text=status)
+            if percent is not None:
+                progressbar['value'] = percent
+        except tk.TclError:
+            pass
+    finally:
+        try:
+            root.after(UI_FRAME_MS, ui_pump)
+        except tk.TclError:
+            pass  # window destroyed
 
 def _set_running_ui(running: bool):
     is_running.set(running)
     state = tk.DISABLED if running else tk.NORMAL
-    for w in (btn_validate, btn_gen, btn_clear_pull, btn_git_pull, repo_combo, branch_combo):
+    for w in (btn_validate, btn_matrix, btn_gen, btn_clear_pull, btn_git_pull, repo_combo, branch_combo, ref_combo):
         try:
             w.configure(state=state)
         except tk.TclError:
@@ -314,14 +453,126 @@ def _show_output_ui(msg, success=True):
     git_box.tag_config("err", foreground=BAD)
     git_box.config(state="disabled")
 
+def _append_git_batch_ui(items):
+    """Append finished git lines; the last carriage-return update stays as one live line."""
+    done, live = [], None
+    for msg, ok, partial in items:
+        if partial:
+            live = (msg, ok)
+        else:
+            done.append((msg, ok))
+            live = None
+    git_box.config(state="normal")
+    ranges = git_box.tag_ranges("live")
+    if ranges:
+        git_box.delete(ranges[0], ranges[-1])
+    args = []
+    for msg, ok in done:
+        args.extend((msg + "\n", ("ok" if ok else "err",)))
+    if live:
+        args.extend((live[0], ("ok" if live[1] else "err", "live")))
+    if args:
+        git_box.insert(tk.END, *args)
+    git_box.see(tk.END)
+    git_box.config(state="disabled")
+
+def git_line(msg, ok=True, partial=False):
+    if threading.current_thread() is threading.main_thread():
+        _append_git_batch_ui([(msg, ok, partial)])
+    else:
+        ui_post({"type": "git_line", "msg": msg, "ok": ok, "partial": partial})
+
+def run_git(repo_path, *args):
+    """git <args> streamed into the Git console; Cancel kills it."""
+    git_line(f"> git {' '.join(args)}")
+    ok, out = stream_cmd(["git", *args], cwd=repo_path, on_line=git_line, cancel=cancel_event)
+    if not ok:
+        git_line(out.splitlines()[-1] if out.strip() else "git failed", False)
+    return ok, out
+
+def start_git_job(target, *args):
+    """Run a git sequence on a worker with the buttons disabled, like validation."""
+    if is_running.get():
+        return
+    cancel_event.clear()
+    set_running(True)
+    show_output("", True)
+
+    def job():
+        try:
+            target(*args)
+        except Exception as e:
+            git_line(f"Git failed: {e}", False)
+        finally:
+            set_running(False)
+            cancel_event.clear()
+            ui_call(update_current_branch_label)
+    threading.Thread(target=job, daemon=True).start()
+
+_progress_log = None
+
+def _prune_progress_logs():
+    """Delete all but the newest PROGRESS_LOG_KEEP - 1 earlier session logs."""
+    older = sorted(p for p in glob.glob(os.path.join(LOGS_DIR, "progress_session_*.log")) if p != PROGRESS_LOG_PATH)
+    for path in older[:max(0, len(older) - (PROGRESS_LOG_KEEP - 1))]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _write_progress_log(lines):
+    """Append lines to this session's progress log (the console only keeps the tail)."""
+    global _progress_log
+    try:
+        if _progress_log is None:
+            _prune_progress_logs()
+            _progress_log = open(PROGRESS_LOG_PATH, "a", encoding="utf-8")
+        stamp = time.strftime("%H:%M:%S")
+        _progress_log.write("".join(f"{stamp} {'OK ' if ok else 'ERR'} {msg}\n" for msg, ok in lines))
+        _progress_log.flush()
+    except OSError:
+        pass
+
 def _append_progress_ui(msg, ok=True):
+    _append_progress_batch_ui([(msg, ok)])
+
+def _append_progress_batch_ui(lines):
+    """Log every line, then show the last PROGRESS_MAX_LINES with one Text.insert call."""
+    _write_progress_log(lines)
+    if progress_verbosity.get() != "All":
+        lines = [(msg, ok) for msg, ok in lines if not ok or not ITEM_LINE.match(msg)]
+    if not lines:
+        return
+    chunks = []
+    for msg, ok in lines[-PROGRESS_MAX_LINES:]:
+        tag = ("ok" if ok else "err",)
+        if chunks and chunks[-1][1] == tag:
+            chunks[-1][0].append(msg)
+        else:
+            chunks.append(([msg], tag))
+    args = []
+    for msgs, tag in chunks:
+        args.extend(("\n".join(msgs) + "\n", tag))
     progress_box.configure(state="normal")
-    progress_box.insert(tk.END, msg + "\n", ("ok" if ok else "err",))
-    progress_box.tag_config("ok", foreground=GOOD)
-    progress_box.tag_config("err", foreground=BAD)
+    progress_box.insert(tk.END, *args)
+    progress_box.delete("1.0", f"end-{PROGRESS_MAX_LINES + 1}l")
     progress_box.see(tk.END)
     progress_box.configure(state="disabled")
 
+def open_progress_log():
+    if _progress_log is None or not os.path.isfile(PROGRESS_LOG_PATH):
+        messagebox.showinfo("Progress log", "Nothing has been logged in this session yet.")
+        return
+    try:
+        if platform.system() == "Windows":
+            os.startfile(PROGRESS_LOG_PATH)  # type: ignore
+        elif platform.system() == "Darwin":
+            subprocess.Popen(["open", PROGRESS_LOG_PATH])
+        else:
+            subprocess.Popen(["xdg-open", PROGRESS_LOG_PATH])
+    except Exception as e:
+        messagebox.showerror("Progress log", str(e))
+
 def append_progress(msg, ok=True):
     if threading.current_thread() is threading.main_thread():
         _append_progress_ui(msg, ok)
@@ -331,35 +582,77 @@ def append_progress(msg, ok=True):
 def git_switch_reset_pull(branch_short):
     repo_path = ensure_repo_selected()
     if not repo_path:
-        return False
-    full_name = full_branch_name(branch_short)
-    show_output(f"> Switching to {full_name} ...", True)
-    append_progress(f"Git: switch {full_name}", True)
-    ok1, out1 = run_cmd(["git", "switch", full_name], cwd=repo_path)
-    show_output(out1, ok1)
-    append_progress(out1.strip(), ok1)
-    if not ok1:
-        return False
+        return
+    start_git_job(_git_switch_reset_pull_worker, repo_path, full_branch_name(branch_short))
 
-    show_output(f"> Reset to origin/{full_name} ...", True)
-    ok2, out2 = run_cmd(["git", "fetch", "origin"], cwd=repo_path)
-    append_progress(("Fetched origin" if ok2 else out2.strip()), ok2)
-    if not ok2:
-        show_output(out2, False)
+FETCH_SIZE_RE = re.compile(
+    r"(?:Receiving|Unpacking) objects: 100% \((\d+)/\d+\)(?:, ([\d.]+) (bytes|KiB|MiB|GiB))?"
+)
+FETCH_TOTAL_RE = re.compile(r"remote: Total (\d+)")
+SIZE_UNITS = {"bytes": 1, "KiB": 1 << 10, "MiB": 1 << 20, "GiB": 1 << 30}
+
+def fetch_transfer(output):
+    """
+    (objects, bytes) sent by `git fetch --progress`, either None when git did
+    not say. Small fetches, e.g. from a local bare remote, print no "Receiving
+    objects" line; the count then comes from "remote: Total N".
+    """
+    objects = size = None
+    for m in FETCH_SIZE_RE.finditer(output):
+        objects = int(m.group(1))
+        size = int(float(m.group(2)) * SIZE_UNITS[m.group(3)]) if m.group(2) else None
+    if objects is None:
+        totals = FETCH_TOTAL_RE.findall(output)
+        objects = int(totals[-1]) if totals else None
+    return objects, size
+
+def _rev(repo_path, rev):
+    ok, out = run_cmd(["git", "rev-parse", "--verify", "--quiet", rev], cwd=repo_path, timeout=60)
+    return out.strip() if ok else None
+
+def _git_switch_reset_pull_worker(repo_path, full_name):
+    # only the selected branch: the shared remote has hundreds of release branches
+    remote_ref = f"refs/remotes/origin/{full_name}"
+    before = _rev(repo_path, remote_ref)
+    append_progress(f"Git: fetch origin {full_name}", True)
+    ok, out = run_git(repo_path, "fetch", "--progress", "origin", f"+refs/heads/{full_name}:{remote_ref}")
+    if not ok:
+        append_progress(out.strip(), False)
         return False
+    after = _rev(repo_path, remote_ref)
+    if after == before:
+        append_progress(f"Fetched origin/{full_name}: already up to date", True)
+    else:
+        objects, size = fetch_transfer(out)
+        moved = f"{before[:7] if before else 'new'}..{(after or '')[:7]}"
+        amount = "".join([f", {objects} objects" if objects is not None else "",
+                          f", {size / (1 << 20):.2f} MiB" if size is not None else ""])
+        append_progress(f"Fetched origin/{full_name}: {moved}{amount}", True)
 
-    ok3, out3 = run_cmd(["git", "reset", "--hard", f"origin/{full_name}"], cwd=repo_path)
-    show_output(out3, ok3)
-    append_progress(out3.strip(), ok3)
-    if not ok3:
+    append_progress(f"Git: switch {full_name}", True)
+    if _rev(repo_path, f"refs/heads/{full_name}"):
+        ok, out = run_git(repo_path, "switch", full_name)
+    else:
+        # no DWIM here: single-branch clones do not map origin/<branch> to a fetch refspec
+        ok, out = run_git(repo_path, "switch", "-c", full_name, f"origin/{full_name}")
+    append_progress(out.strip(), ok)
+    if not ok:
+        return False
+    # --track / --set-upstream-to refuse a ref outside the fetch refspec; set the upstream
+    # directly so Git Pull (current) works on this branch afterwards
+    for key, value in (("remote", "origin"), ("merge", f"refs/heads/{full_name}")):
+        ok, out = run_cmd(["git", "config", f"branch.{full_name}.{key}", value], cwd=repo_path, timeout=60)
+        if not ok:
+            append_progress(out.strip(), False)
+            return False
+
+    ok, out = run_git(repo_path, "reset", "--hard", f"origin/{full_name}")
+    append_progress(out.strip(), ok)
+    if not ok:
         return False
 
-    show_output("> git pull ...", True)
-    ok4, out4 = run_cmd(["git", "pull"], cwd=repo_path)
-    show_output(out4, ok4)
-    append_progress(out4.strip(), ok4)
-    update_current_branch_label()
-    return ok4
+    info("Git: branch updated.")
+    return True
 
 def on_branch_selected(event=None):
     b = branch_var.get().strip()
@@ -395,11 +688,12 @@ def git_pull_current():
     repo_path = ensure_repo_selected()
     if not repo_path:
         return
-    show_output("> git pull ...", True)
-    ok, out = run_cmd(["git", "pull"], cwd=repo_path)
-    show_output(out, ok)
+    start_git_job(_git_pull_worker, repo_path)
+
+def _git_pull_worker(repo_path):
+    ok, out = run_git(repo_path, "pull", "--progress")
     append_progress(out.strip(), ok)
-    update_current_branch_label()
+    info("Git: pulled latest." if ok else "Git: pull failed.")
 
 # ----------------------------- CSV & XML helpers -----------------------------
 def browse_csv():
@@ -419,21 +713,9 @@ def validate_csv_headers():
     if not os.path.isfile(path):
         messagebox.showerror("CSV", f"CSV not found:\n{path}")
         return False
-    try:
-        with open(path, "r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.reader(f)
-            try:
-                headers = next(reader)
-            except StopIteration:
-                messagebox.showerror("CSV", "CSV is empty.")
-                return False
-    except Exception as e:
-        messagebox.showerror("CSV", f"Failed to read CSV:\n{e}")
-        return False
-
-    missing = [h for h in REQUIRED_HEADERS if h not in headers]
-    if missing:
-        messagebox.showerror("CSV", f"Missing required headers: {', '.join(missing)}")
+    ok, msg = check_csv_headers(path)
+    if not ok:
+        messagebox.showerror("CSV", msg)
         return False
     info("CSV header validation passed.")
     append_progress("CSV header validation passed.", True)
@@ -444,21 +726,6 @@ def list_switch_xml_files(xml_dir, switch_name):
     switch_low = (switch_name or "").lower()
     files = [p for p in glob.glob(pattern) if switch_low in os.path.basename(p).lower()]
     return files
-def parse_xml_text(xml_file):
-    try:
-        with open(xml_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        linear = " ".join(content.split())
-        root_elem = ET.fromstring(linear)
-        return (True, root_elem, linear)
-    except Exception as e:
-        return (False, None, f"XML parse error in {os.path.basename(xml_file)}: {e}")
-
-def get_text(root_elem, relative_xpath):
-    node = root_elem.find(relative_xpath)
-    if node is None:
-        return None
-    return (node.text or "").strip()
 
 def write_csv(rows, path, headers):
     with open(path, "w", encoding="utf-8", newline="") as f:
@@ -467,7 +734,10 @@ def write_csv(rows, path, headers):
         for r in rows:
             writer.writerow(r)            
 
+_search_seq = 0   # the latest Search click; older lookups finishing late are ignored
+
 def search_switch_in_xml():
+    global _search_seq
     switch_name = search_switch_var.get().strip()
     xml_dir = xml_path_var.get().strip()
     if not switch_name:
@@ -476,24 +746,44 @@ def search_switch_in_xml():
     if not xml_dir or not os.path.isdir(xml_dir):
         messagebox.showwarning("XML", f"XML directory not found:\n{xml_dir}")
         return
-    matched_files = list_switch_xml_files(xml_dir, switch_name)
+    repo_path = os.path.join(PARENT_DIR, repo_var.get().strip())
+    _search_seq += 1
+    search_result_var.set("Searching...")
+    # the catalog check runs git and the fallback lists the folder; neither belongs on the Tk thread
+    t = threading.Thread(target=_search_switch_worker, args=(_search_seq, repo_path, xml_dir, switch_name), daemon=True)
+    t.start()
+
+def _search_switch_worker(seq, repo_path, xml_dir, switch_name):
+    try:
+        result = _find_switch(repo_path, xml_dir, switch_name)
+    except Exception as e:
+        result = (f"Search failed: {e}", "", "", "")
+    ui_call(lambda: _show_search_result(seq, *result))
+
+def _find_switch(repo_path, xml_dir, switch_name):
+    """(result text, reference, switch value, file path) for the first XML matching switch_name."""
+    view = open_catalog_view(switch_catalog, repo_path, xml_dir, build=False)
+    if view is not None:
+        matched_files = SwitchXmlIndex(view.paths).lookup(switch_name)
+    else:
+        matched_files = list_switch_xml_files(xml_dir, switch_name)
     if not matched_files:
-        search_result_var.set("No XML file found for Switch Name.")
-        search_ref_var.set("")
-        search_value_var.set("")
-        search_file_path_var.set("")
-        return
+        return ("No XML file found for Switch Name.", "", "", "")
     xml_file = matched_files[0]
-    ok_parse, root_elem, lin_or_err = parse_xml_text(xml_file)
+    if view is not None:
+        ok_parse, fields_or_err = view.fields_of(xml_file)
+    else:
+        ok_parse, fields_or_err = xml_cache.fields_for(xml_file)
     if not ok_parse:
-        search_result_var.set(f"XML parse error: {lin_or_err}")
-        search_ref_var.set("")
-        search_value_var.set("")
-        search_file_path_var.set("")
+        return (f"XML parse error: {fields_or_err}", "", "", "")
+    ref_text = fields_or_err["Reference"] or ""
+    sw_text = fields_or_err["Switch"] or ""
+    return (f"Found in: {os.path.basename(xml_file)}", ref_text, sw_text, xml_file)
+
+def _show_search_result(seq, result, ref_text, sw_text, xml_file):
+    if seq != _search_seq:
         return
-    ref_text = get_text(root_elem, XPATH_REFERENCE) or ""
-    sw_text = get_text(root_elem, XPATH_SWITCH) or ""
-    search_result_var.set(f"Found in: {os.path.basename(xml_file)}")
+    search_result_var.set(result)
     search_ref_var.set(ref_text)
     search_value_var.set(sw_text)
     search_file_path_var.set(xml_file)
@@ -515,44 +805,310 @@ def open_searched_xml_file():
 
 # ----------------------------- Results table helpers -----------------------------
 results_headers = ["ADO Reference", "Switch Name", "Value", "Status", "GitXmlValue", "MatchedFiles"]
+STATUS_RANK = {"FAILED": 0, "VALIDATED": 1}
+_ADO_RE = re.compile(r"\s*(\D*?)\s*(\d+)")
+
+def _ado_key(text):
+    """'BUG 1234' -> ('bug', 1234) so ADO numbers sort numerically."""
+    m = _ADO_RE.match(text or "")
+    return (m.group(1).lower(), int(m.group(2))) if m else ((text or "").lower(), -1)
+
+def result_sort_key(col, row):
+    value = row.get(col) or ""
+    if col == "ADO Reference":
+        return _ado_key(value)
+    if col == "Status":
+        return (STATUS_RANK.get(value.upper(), 2), value.upper())
+    return value.lower()
+
+def result_tiebreak_key(row, i):
+    """Secondary order for every sort: status, switch name, ADO number, arrival."""
+    status = (row.get("Status") or "").upper()
+    return (STATUS_RANK.get(status, 2), (row.get("Switch Name") or "").lower(),
+            _ado_key(row.get("ADO Reference")), i)
+
+class _Descending:
+    """Inverts comparisons of a sort key, for bisecting into a descending order."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
 
-def _append_result_row_ui(row_dict, tag=None):
-    vals = [row_dict.get(h, "") for h in results_headers]
-    results_tree.insert("", tk.END, values=vals, tags=(tag,) if tag else ())
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class VirtualResultsView:
+    """
+    Results table that keeps every row in a Python list and only creates Tk
+    items for the rows that fit in the Treeview (iid = index into `rows`).
+    Inserting, scrolling, sorting and filtering therefore cost the same for
+    50 rows or 500k; the separate scrollbar is driven by the view position.
+    Filtering uses a lowercased search key and a status index built as rows
+    arrive; a query that extends the previous one only rescans its matches.
+    """
+    def __init__(self, tree, vsb, headers):
+        self.tree = tree
+        self.vsb = vsb
+        self.headers = headers
+        self.rows = []          # backing store, arrival order
+        self.tags = []          # "ok" / "fail" per row
+        self.keys = []          # lowercased "switch name ado reference" per row
+        self.by_status = {}     # upper-case Status -> row indices
+        self.tiebreak = []      # result_tiebreak_key per row
+        self._perms = {}        # (column, descending) -> (sorted row indices, their bisect keys)
+        self._base = []         # row indices in tiebreak order
+        self._base_keys = []
+        self.view = []          # row indices that pass the filter, in sort order
+        self.selected = set()   # selected row indices (survive scrolling)
+        self.top = 0
+        self.page = 10
+        self._term = ""
+        self._status = "ALL"
+        self._sort = None       # (column, descending)
+        self._needs_sort = False
+        self._render_pending = False
+        self._extend = False
+        vsb.configure(command=self.yview)
+        tree.configure(yscrollcommand=lambda *_: None)
+        tree.bind("<Configure>", self._on_resize)
+        tree.bind("<<TreeviewSelect>>", self._on_select)
+        tree.bind("<ButtonPress-1>", self._remember_modifiers, add="+")
+        tree.bind("<MouseWheel>", lambda e: self._scroll(-3 if e.delta > 0 else 3))
+        tree.bind("<Button-4>", lambda e: self._scroll(-3))
+        tree.bind("<Button-5>", lambda e: self._scroll(3))
+        for key in ("Up", "Down", "Prior", "Next", "Home", "End"):
+            tree.bind(f"<KeyPress-{key}>", self._on_key)
+
+    # --- data ---
+    def clear(self):
+        self.rows.clear()
+        self.tags.clear()
+        self.keys.clear()
+        self.by_status.clear()
+        self.tiebreak.clear()
+        self._perms.clear()
+        self._base = []
+        self._base_keys = []
+        self.view.clear()
+        self.selected.clear()
+        self.top = 0
+        self.render()
+
+    def extend(self, rows_and_tags):
+        term, status_pick = self._term, self._status
+        for row, tag in rows_and_tags:
+            i = len(self.rows)
+            key = f"{row.get('Switch Name','')} {row.get('ADO Reference','')}".lower()
+            status = (row.get("Status") or "").upper()
+            self.rows.append(row)
+            self.tags.append(tag)
+            self.keys.append(key)
+            self.by_status.setdefault(status, []).append(i)
+            self.tiebreak.append(result_tiebreak_key(row, i))
+            if term in key and status_pick in ("ALL", status):
+                self.view.append(i)
+        self._needs_sort = self._sort is not None
+        self.schedule_render()
+
+    def set_filter(self, term="", status="ALL"):
+        """Show rows whose search key contains term and whose Status is status ("ALL" for any)."""
+        term = (term or "").lower().strip()
+        status = (status or "ALL").upper()
+        if term == self._term and status == self._status:
+            return
+        keys = self.keys
+        if status == self._status and term.startswith(self._term):
+            # narrowing: the current matches are a superset and already sorted
+            self.view = [i for i in self.view if term in keys[i]]
+        else:
+            base = range(len(self.rows)) if status == "ALL" else self.by_status.get(status, [])
+            self.view = [i for i in base if term in keys[i]] if term else list(base)
+            self._needs_sort = self._sort is not None
+        self._term, self._status = term, status
+        self.top = 0
+        self.render()
+
+    def sort_by(self, col, descending=False):
+        self._sort = (col, descending)
+        self._needs_sort = True
+        self.render()
+
+    def _tiebreak_order(self):
+        """Row indices in result_tiebreak_key order; the base every column sort refines."""
+        if len(self._base) < len(self.rows):
+            if not self._base:
+                self._base = sorted(range(len(self.rows)), key=self.tiebreak.__getitem__)
+                self._base_keys = [self.tiebreak[i] for i in self._base]
+            for i in range(len(self._base), len(self.rows)):
+                pos = bisect.bisect(self._base_keys, self.tiebreak[i])
+                self._base_keys.insert(pos, self.tiebreak[i])
+                self._base.insert(pos, i)
+        return self._base
+
+    def _perm_key(self, col, descending, i):
+        primary = result_sort_key(col, self.rows[i])
+        return (_Descending(primary) if descending else primary, self.tiebreak[i])
+
+    def _sorted_rows(self, col, descending):
+        """
+        All row indices in (column, descending) order, cached per column and
+        direction. Rows that arrived since the last call are bisected in, so a
+        sorted table stays sorted while a run is streaming.
+        """
+        cached = self._perms.get((col, descending))
+        if cached is None:
+            if col == "ADO Reference":  # already parsed for the tiebreak
+                primary = [t[2] for t in self.tiebreak]
+            else:
+                primary = [result_sort_key(col, row) for row in self.rows]
+            perm = list(self._tiebreak_order())
+            perm.sort(key=primary.__getitem__, reverse=descending)
+            cached = self._perms[(col, descending)] = (perm, None)
+        perm, keys = cached
+        if len(perm) < len(self.rows):
+            if keys is None:  # only needed once rows arrive after the sort
+                keys = [self._perm_key(col, descending, i) for i in perm]
+                self._perms[(col, descending)] = (perm, keys)
+            for i in range(len(perm), len(self.rows)):
+                k = self._perm_key(col, descending, i)
+                pos = bisect.bisect(keys, k)
+                keys.insert(pos, k)
+                perm.insert(pos, i)
+        return perm
+
+    def _apply_sort(self):
+        perm = self._sorted_rows(*self._sort)
+        if len(self.view) == len(perm):
+            self.view = list(perm)
+        else:
+            keep = set(self.view)
+            self.view = [i for i in perm if i in keep]
+        self._needs_sort = False
+
+    def selected_rows(self):
+        return [self.rows[i] for i in self.view if i in self.selected]
+
+    def select_only(self, i):
+        self.selected = {i}
+        self.render()
+
+    # --- drawing ---
+    def schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.tree.after_idle(self.render)
+
+    def render(self):
+        self._render_pending = False
+        if self._needs_sort:
+            self._apply_sort()
+        tree = self.tree
+        n = len(self.view)
+        self.top = max(0, min(self.top, n - self.page))
+        window = self.view[self.top:self.top + self.page]
+        tree.delete(*tree.get_children())
+        for pos, i in enumerate(window, start=self.top):
+            row = self.rows[i]
+            tags = (self.tags[i], "even" if pos % 2 == 0 else "odd") if self.tags[i] else ("even" if pos % 2 == 0 else "odd",)
+            tree.insert("", tk.END, iid=str(i), values=[row.get(h, "") for h in self.headers], tags=tags)
+        tree.selection_set([str(i) for i in window if i in self.selected])
+        if n:
+            self.vsb.set(self.top / n, min(1.0, (self.top + self.page) / n))
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def _on_resize(self, event=None):
+        row_h = 24
+        top_y = row_h
+        kids = self.tree.get_children()
+        box = self.tree.bbox(kids[0]) if kids else ""
+        if box:
+            top_y, row_h = box[1], box[3]
+        page = max(1, (self.tree.winfo_height() - top_y) // row_h)
+        if page != self.page:
+            self.page = page
+            self.render()
+
+    # --- interaction ---
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.view))
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (self.page if args[2] == "pages" else 1)
+        self.render()
+
+    def _scroll(self, units):
+        self.top += units
+        self.render()
+        return "break"
+
+    def _remember_modifiers(self, event):
+        self._extend = bool(event.state & 0x0005)  # Shift or Control
+
+    def _on_select(self, event=None):
+        visible = {int(iid) for iid in self.tree.get_children()}
+        picked = {int(iid) for iid in self.tree.selection()}
+        if picked == self.selected & visible:
+            return  # our own selection_set from render()
+        if self._extend:
+            self.selected = (self.selected - visible) | picked
+        else:
+            self.selected = picked
+        self._extend = False
+
+    def _on_key(self, event):
+        """Move the selection past the rendered window; inside it Treeview handles keys."""
+        kids = self.tree.get_children()
+        if not kids:
+            return None
+        focus = self.tree.focus()
+        step = {"Up": -1, "Down": 1, "Prior": -self.page, "Next": self.page,
+                "Home": -len(self.view), "End": len(self.view)}[event.keysym]
+        if abs(step) == 1 and focus and focus != (kids[0] if step < 0 else kids[-1]):
+            return None
+        pos = self.view.index(int(focus)) if focus and int(focus) in self.view else self.top
+        pos = max(0, min(len(self.view) - 1, pos + step))
+        if pos < self.top:
+            self.top = pos
+        elif pos >= self.top + self.page:
+            self.top = pos - self.page + 1
+        i = self.view[pos]
+        if event.state & 0x0001:
+            self.selected.add(i)
+        else:
+            self.selected = {i}
+        self.render()
+        self.tree.focus(str(i))
+        self.tree.see(str(i))
+        return "break"
 
 def append_result_row(row_dict, ok, note="", color_tag=None):
-    # cache for filtering
     row_cache = {h: row_dict.get(h, "") for h in results_headers}
-    _all_rows.append(row_cache)
     if threading.current_thread() is threading.main_thread():
-        _append_result_row_ui(row_cache, color_tag)
+        results_view.extend([(row_cache, color_tag)])
     else:
         ui_post({"type":"result_row","row":row_cache,"tag":color_tag})
 
-def refresh_zebra():
-    for i, iid in enumerate(results_tree.get_children("")):
-        base_tags = list(results_tree.item(iid, "tags"))
-        base_tags = [t for t in base_tags if t not in ("even", "odd")]
-        base_tags.append("even" if i % 2 == 0 else "odd")
-        results_tree.item(iid, tags=tuple(base_tags))
+FILTER_DEBOUNCE_MS = 120
+_filter_job = None
 
 def apply_results_filter(*_):
-    term = (results_search_var.get() or "").lower().strip()
-    status_pick = status_filter_var.get()
-    # rebuild table
-    for iid in results_tree.get_children(""):
-        results_tree.delete(iid)
-    for r in _all_rows:
-        if term:
-            hay = f"{r.get('Switch Name','')} {r.get('ADO Reference','')}".lower()
-            if term not in hay:
-                continue
-        if status_pick != "All":
-            if (r.get("Status","").upper() != status_pick.upper()):
-                continue
-        tag = "ok" if r.get("Status","").upper() == "VALIDATED" else "fail"
-        _append_result_row_ui(r, tag)
-    refresh_zebra()
+    global _filter_job
+    if _filter_job is not None:
+        root.after_cancel(_filter_job)
+        _filter_job = None
+    results_view.set_filter(results_search_var.get(), status_filter_var.get())
+
+def schedule_results_filter(*_):
+    """Re-filter once typing pauses instead of on every keystroke."""
+    global _filter_job
+    if _filter_job is not None:
+        root.after_cancel(_filter_job)
+    _filter_job = root.after(FILTER_DEBOUNCE_MS, apply_results_filter)
 
 def clear_results_filters():
     """
@@ -581,150 +1137,129 @@ def process_validation():
         if not path or not os.path.isfile(path):
             messagebox.showwarning("CSV", "Please select a valid CSV.")
             return
-        if not xml_dir or not os.path.isdir(xml_dir):
+        ref = validate_ref_var.get().strip()
+        if not xml_dir or (not os.path.isdir(xml_dir) and not ref):
             messagebox.showwarning("XML", f"XML directory not found:\n{xml_dir}")
             return
         if not validate_csv_headers():
             return
-        stamp = ts()
+        stamp = unique_stamp(RESULTS_DIR, ts())
         result_path = os.path.join(RESULTS_DIR, f"switch_validation_result_{stamp}.csv")
         log_path = os.path.join(LOGS_DIR, f"switch_validation_log_{stamp}.log")
         do_log = logging_enabled.get()
 
-        try:
-            with open(path, "r", encoding="utf-8-sig", newline="") as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-        except Exception as e:
-            messagebox.showerror("CSV", f"Failed to read CSV rows:\n{e}")
-            return
-
         # prepare UI table
         ui_post({"type": "clear_results"})
-        _all_rows.clear()
-        processed = []
-        total = len(rows)
-        append_progress(f"Validation started. Records: {total}", True)
-
-        out_headers = [
-            "ADO Reference", "Release", "Switch Name", "Divisions", "Value",
-            "Status", "GitXmlValue", "MatchedFiles"
-        ]
-        log_f = open(log_path, "w", encoding="utf-8") if do_log else None
-        if do_log:
-            log_f.write(
+
+        previous = None
+        if ref:
+            # another branch straight from git objects; the checkout is left alone
+            catalog_view = open_ref_view(
+                switch_catalog, repo_path, ref, xml_dir, cancel_event=cancel_event, progress=append_progress
+            )
+            if catalog_view is None:
+                info(f"Validation: cannot read {ref}.")
+                return
+        else:
+            if incremental_enabled.get():
+                previous = plan_revalidation(validation_state, repo_path, path, xml_dir, progress=append_progress)
+            # an incremental rerun only touches a few files; don't build a whole catalog for it
+            catalog_view = open_catalog_view(
+                switch_catalog, repo_path, xml_dir, build=previous is None, cache=xml_cache,
+                workers=default_workers() if parallel_enabled.get() else 1,
+                cancel_event=cancel_event, progress=append_progress,
+            )
+
+        # rows are streamed from the CSV and appended to the result file and
+        # log as they complete, so a cancel or crash keeps a valid partial result
+        summary = run_validation(
+            path, xml_dir, result_path,
+            log_path=log_path if do_log else None,
+            log_header=(
                 f"Validation Log - {stamp}\n"
                 f"Repo: {repo_var.get()}\n"
-                f"Branch: {current_branch.get()}\n"
+                f"Branch: {ref or current_branch.get()}\n"
                 f"XML Path: {xml_dir}\n"
                 f"Source CSV: {path}\n\n"
-            )
-
-        for idx, row in enumerate(rows, start=1):
-            if cancel_event.is_set():
-                append_progress("Validation cancelled by user.", False)
-                break
-
-            set_progress((idx - 1) * 100.0 / max(1, total))
-            ado_ref = (row.get("ADO Reference") or "").strip()
-            release = (row.get("Release") or "").strip()
-            switch_name = (row.get("Switch Name") or "").strip()
-            divisions = (row.get("Divisions") or "").strip()
-            csv_value_raw = (row.get("Value") or "").strip()
-            csv_value_up = csv_value_raw.upper()
-
-            if do_log:
-                log_f.write(
-                    f"[Row {idx}] ADO:{ado_ref} Release:{release} "
-                    f"Switch:{switch_name} Divisions:{divisions} Value(csv):{csv_value_raw}\n"
-                )
-
-            matched_files = list_switch_xml_files(xml_dir, switch_name)
-            if do_log:
-                log_f.write(f" Matched XML files: {matched_files if matched_files else 'None'}\n")
-
-            result_status = "FAILED"
-            git_xml_value = ""
-            note = ""
-            is_ok = False
-
-            if len(matched_files) == 0:
-                note = "No XML file found for Switch Name"
-                append_progress(f"[{idx}/{total}] {switch_name}: {note}", False)
-            elif len(matched_files) > 1:
-                note = "Failed: multiple files present"
-                files = ", ".join(os.path.basename(x) for x in matched_files)
-                append_progress(f"[{idx}/{total}] {switch_name}: {note} -> {files}", False)
-            else:
-                xml_file = matched_files[0]
-                ok_parse, root_elem, lin_or_err = parse_xml_text(xml_file)
-                if not ok_parse:
-                    note = f"XML parse error: {lin_or_err}"
-                    append_progress(f"[{idx}/{total}] {switch_name}: {note}", False)
-                else:
-                    ref_text = get_text(root_elem, XPATH_REFERENCE) or ""
-                    sw_text = get_text(root_elem, XPATH_SWITCH) or ""
-                    git_xml_value = sw_text
-                    ref_ok = (switch_name.upper() == ref_text.strip().upper())
-                    sw_ok = (csv_value_up == sw_text.strip().upper())
-
-                    if do_log:
-                        log_f.write(f" XPath Reference: {XPATH_REFERENCE} -> '{ref_text}'\n")
-                        log_f.write(f" XPath Switch: {XPATH_SWITCH} -> '{sw_text}'\n")
-
-                    if ref_ok and sw_ok:
-                        result_status = "VALIDATED"
-                        is_ok = True
-                        note = "OK"
-                        append_progress(f"[{idx}/{total}] {switch_name}: Validated", True)
-                    else:
-                        mism = []
-                        if not ref_ok: mism.append("Reference mismatch")
-                        if not sw_ok:  mism.append("Switch value mismatch")
-                        note = "; ".join(mism) if mism else "Mismatch"
-                        append_progress(
-                            f"[{idx}/{total}] {switch_name}: {note} (GIT Switch='{sw_text}')",
-                            False
-                        )
-
-            out_row = {
-                "ADO Reference": ado_ref,
-                "Release": release,
-                "Switch Name": switch_name,
-                "Divisions": divisions,
-                "Value": csv_value_raw,
-                "Status": result_status,
-                "GitXmlValue": git_xml_value,
-                "MatchedFiles": ", ".join(matched_files) if matched_files else ""
-            }
-            processed.append(out_row)
-            tag = "ok" if is_ok else "fail"
-            append_result_row(out_row, is_ok, note, color_tag=tag)
-
-            if do_log:
-                log_f.write(
-                    f" Result: {result_status}. Note: {note}. GitXmlValue: '{git_xml_value}'\n\n"
-                )
-
-        write_csv(processed, result_path, headers=out_headers)
-        append_progress(f"Validation completed. Results saved: {result_path}", True)
-        if do_log:
-            log_f.write(f"Completed. Results: {result_path}\n")
+            ),
+            cache=xml_cache,
+            cancel_event=cancel_event,
+            progress=append_progress,
+            on_row=lambda out_row, is_ok, note: append_result_row(
+                out_row, is_ok, note, color_tag="ok" if is_ok else "fail"),
+            on_percent=set_progress,
+            catalog_view=catalog_view,
+            previous=previous,
+        )
+        if not ref:
+            record_validation(validation_state, repo_path, path, xml_dir, summary)
         info("Validation finished.")
     except Exception as e:
         messagebox.showerror("Validation Error", str(e))
     finally:
         set_running(False)
         cancel_event.clear()
-        # Re-apply current filter after final rows inserted (fix)
-        root.after(10, apply_results_filter)
 
 def start_validation_thread():
+    if is_running.get():
+        return
     cancel_event.clear()
     set_running(True)
     t = threading.Thread(target=process_validation, daemon=True)
     t.start()
 
+def process_matrix_validation():
+    """Validate the CSV against every branch in branch_config.json into one wide result."""
+    try:
+        path = csv_path_var.get().strip()
+        xml_dir = xml_path_var.get().strip()
+        repo_path = ensure_repo_selected()
+        if not repo_path:
+            return
+        if not path or not os.path.isfile(path):
+            messagebox.showwarning("CSV", "Please select a valid CSV.")
+            return
+        if not validate_csv_headers():
+            return
+        refs = {b: f"origin/{full_branch_name(b)}" for b in load_branches_from_config()}
+        if not refs:
+            messagebox.showwarning("Matrix", f"No branches configured in:\n{BRANCH_CONFIG}")
+            return
+        result_path = os.path.join(RESULTS_DIR, f"switch_validation_matrix_{unique_stamp(RESULTS_DIR, ts())}.csv")
+        ui_post({"type": "clear_results"})
+        views = open_ref_views(switch_catalog, repo_path, refs, xml_dir,
+                               cancel_event=cancel_event, progress=append_progress)
+        if cancel_event.is_set() or not views:
+            info("Matrix validation: no branch could be read.")
+            return
+
+        def on_row(out_row, is_ok, note):
+            # the table keeps its columns: per-branch values go into GitXmlValue
+            per_branch = " | ".join(
+                f"{label}: {out_row[f'{label} GitXmlValue'] or '-'} ({out_row[f'{label} Status']})"
+                for label in views
+            )
+            append_result_row(dict(out_row, GitXmlValue=per_branch), is_ok, note,
+                              color_tag="ok" if is_ok else "fail")
+
+        run_validation_matrix(
+            path, views, result_path, cancel_event=cancel_event, progress=append_progress,
+            on_row=on_row, on_percent=set_progress,
+        )
+        info("Matrix validation finished.")
+    except Exception as e:
+        messagebox.showerror("Validation Error", str(e))
+    finally:
+        set_running(False)
+        cancel_event.clear()
+
+def start_matrix_validation_thread():
+    if is_running.get():
+        return
+    cancel_event.clear()
+    set_running(True)
+    threading.Thread(target=process_matrix_validation, daemon=True).start()
+
 def cancel_validation():
     if is_running.get():
         cancel_event.set()
@@ -732,42 +1267,110 @@ def cancel_validation():
 
 # ----------------------------- Generate switch details -----------------------------
 def generate_switch_details():
+    repo_path = ensure_repo_selected()
+    if not repo_path:
+        return
     xml_dir = xml_path_var.get().strip()
     if not xml_dir or not os.path.isdir(xml_dir):
         messagebox.showwarning("XML", "XML directory not found or not selected.")
         return
 
-    xml_files = sorted(glob.glob(os.path.join(xml_dir, "*.xml")))
-    if not xml_files:
-        messagebox.showinfo("Generate", "No XML files found.")
+    if is_running.get():
         return
-    stamp = ts()
+    stamp = unique_stamp(RESULTS_DIR, ts())
     out_path = os.path.join(RESULTS_DIR, f"switch_details_{stamp}.csv")
-    rows = []
-    append_progress(f"Generate Switch details started. Files: {len(xml_files)}", True)
-
-    for i, xf in enumerate(xml_files, start=1):
-        ok_parse, root_elem, lin_or_err = parse_xml_text(xf)
-        if not ok_parse:
-            append_progress(f"[{i}/{len(xml_files)}] {os.path.basename(xf)} parse error", False)
-            continue
-
-        ref_text = get_text(root_elem, XPATH_REFERENCE) or ""
-        sw_text = get_text(root_elem, XPATH_SWITCH) or ""
-        status = "VALIDATED" if ref_text and sw_text else "FAILED"
-        rows.append({
-            "Switch Name": ref_text,
-            "Value": sw_text,
-            "SourceFile": os.path.basename(xf)
-        })
-        append_progress(
-            f"[{i}/{len(xml_files)}] {os.path.basename(xf)} -> {ref_text}\n{sw_text}",
-            True if status == "VALIDATED" else False
-        )
+    workers = default_workers() if parallel_enabled.get() else 1
+    cancel_event.clear()
+    set_running(True)
+    set_progress(0)
+    info("Generating switch details...")
+    t = threading.Thread(
+        target=_generate_switch_details_worker,
+        args=(repo_path, xml_dir, out_path, workers), daemon=True
+    )
+    t.start()
 
-    write_csv(rows, out_path, headers=["Switch Name", "Value", "SourceFile"])
-    append_progress(f"Switch details CSV saved: {out_path}", True)
-    info("Switch details generated.")   
+def _generate_switch_details_worker(repo_path, xml_dir, out_path, workers):
+    done = 0
+    started = time.perf_counter()
+    try:
+        # listing a large folder is slow enough to freeze the window, so it happens here
+        xml_files = sorted(glob.glob(os.path.join(xml_dir, "*.xml")))
+        total = len(xml_files)
+        if not xml_files:
+            append_progress(f"Generate: no XML files found in {xml_dir}", False)
+            info("Switch details generation: no XML files.")
+            return
+        append_progress(f"Generate Switch details started. Files: {total}, workers: {workers}", True)
+        xml_cache.reset_stats()
+        ident = xml_tree_id(repo_path, xml_dir)
+        records = switch_catalog.load(ident[1]) if ident else None
+        catalog_records = None
+        if records is not None:
+            append_progress(f"Switch catalog: {len(records)} switches for {ident[0][:10]}", True)
+            total = len(records)
+            source = ((os.path.join(xml_dir, name), ok, fields) for name, ok, fields in sorted(records))
+        else:
+            # a clean checkout is cataloged while we are parsing every file anyway
+            catalog_records = [] if ident else None
+            source = iter_switch_fields(
+                xml_files, cache=xml_cache, workers=workers, cancel_event=cancel_event,
+                names=CATALOG_FIELDS if ident else VALIDATION_FIELDS
+            )
+        with open(out_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["Switch Name", "Value", "SourceFile"])
+            writer.writeheader()
+            next_tick = 0.0
+            for xf, ok_parse, fields_or_err in source:
+                if cancel_event.is_set():
+                    break
+                done += 1
+                now = time.perf_counter()
+                if now >= next_tick:
+                    # progressbar, throughput and a flushed partial CSV a few times per second
+                    next_tick = now + 0.25
+                    set_progress(done * 100.0 / total)
+                    info(f"Generating switch details: {done}/{total} ({done / max(now - started, 1e-6):.0f} files/s)")
+                    f.flush()
+                if catalog_records is not None:
+                    catalog_records.append((os.path.basename(xf), ok_parse, fields_or_err))
+                if not ok_parse:
+                    append_progress(f"[{done}/{total}] {os.path.basename(xf)} parse error", False)
+                    continue
+
+                ref_text = fields_or_err["Reference"] or ""
+                sw_text = fields_or_err["Switch"] or ""
+                status = "VALIDATED" if ref_text and sw_text else "FAILED"
+                writer.writerow({
+                    "Switch Name": ref_text,
+                    "Value": sw_text,
+                    "SourceFile": os.path.basename(xf)
+                })
+                append_progress(
+                    f"[{done}/{total}] {os.path.basename(xf)} -> {ref_text}\n{sw_text}",
+                    True if status == "VALIDATED" else False
+                )
+
+        xml_cache.save()
+        if catalog_records is not None and len(catalog_records) == total:
+            switch_catalog.store(ident[1], ident[0], ident[2], catalog_records)
+            append_progress(f"Switch catalog: stored {total} switches.", True)
+        append_progress(f"XML cache: {xml_cache.hits} reused, {xml_cache.misses} parsed", True)
+        elapsed = time.perf_counter() - started
+        rate = f"{done} files in {elapsed:.1f}s ({done / max(elapsed, 1e-6):.0f} files/s)"
+        if cancel_event.is_set():
+            append_progress(f"Generate cancelled after {done}/{total} files. Partial CSV saved: {out_path}", False)
+            info(f"Switch details generation cancelled: {rate}.")
+        else:
+            set_progress(100)
+            append_progress(f"Switch details CSV saved: {out_path}", True)
+            info(f"Switch details generated: {rate}.")
+    except Exception as e:
+        append_progress(f"Generate Switch details failed: {e}", False)
+        info("Switch details generation failed.")
+    finally:
+        set_running(False)
+        cancel_event.clear()
 
 def edit_switch_value_popup():
     file_path = search_file_path_var.get()
@@ -830,7 +1433,8 @@ def load_settings():
 def save_settings():
     data = {
         "repo": repo_var.get(),
-        "csv_path": csv_path_var.get()
+        "csv_path": csv_path_var.get(),
+        "progress_verbosity": progress_verbosity.get()
     }
     try:
         with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
@@ -841,6 +1445,9 @@ def save_settings():
 def on_close():
     cancel_event.set()
     save_settings()
+    xml_cache.save()
+    if _progress_log is not None:
+        _progress_log.close()
     root.destroy()
 
 # ----------------------------- UI layout -----------------------------
@@ -874,6 +1481,7 @@ def open_results_folder():
     except Exception as e:
         messagebox.showerror("Open folder", str(e))
 view_menu.add_command(label="Open results folder", command=open_results_folder)
+view_menu.add_command(label="Open full progress log", command=open_progress_log)
 menubar.add_cascade(label="View", menu=view_menu)
 
 help_menu = tk.Menu(menubar, tearoff=0)
@@ -947,16 +1555,30 @@ btn_validate.grid(row=1, column=1, sticky="w", padx=(0, 6), pady=(0, 6))
 btn_gen = ttk.Button(mid_frame, text="Generate switch details", command=generate_switch_details)
 btn_gen.grid(row=1, column=2, sticky="w", padx=(0, 6), pady=(0, 6))
 
+parallel_chk = ttk.Checkbutton(mid_frame, text="Parallel parsing", variable=parallel_enabled)
+parallel_chk.grid(row=1, column=4, sticky="w", padx=(0, 6), pady=(0, 6))
+
+incremental_chk = ttk.Checkbutton(mid_frame, text="Only recheck changed XMLs", variable=incremental_enabled)
+incremental_chk.grid(row=1, column=5, sticky="w", padx=(0, 6), pady=(0, 6))
+
+def refresh_ref_choices():
+    ref_combo["values"] = [""] + [f"origin/{full_branch_name(b)}" for b in load_branches_from_config()]
+
+ttk.Label(mid_frame, text="Validate against ref:").grid(row=2, column=0, sticky="w", padx=(6, 6), pady=(0, 6))
+ref_combo = ttk.Combobox(mid_frame, textvariable=validate_ref_var, width=50, postcommand=refresh_ref_choices)
+ref_combo.grid(row=2, column=1, columnspan=3, sticky="ew", padx=(0, 6), pady=(0, 6))
+ttk.Label(mid_frame, text="(empty = checked-out files)", foreground=SUBTEXT).grid(row=2, column=4, sticky="w", pady=(0, 6))
+btn_matrix = ttk.Button(mid_frame, text="Validate all branches", command=start_matrix_validation_thread)
+btn_matrix.grid(row=2, column=5, sticky="w", padx=(0, 6), pady=(0, 6))
+
 def clear_results_and_pull():
     # Clear table and progress, then pull
-    _all_rows.clear()
-    for i in results_tree.get_children():
-        results_tree.delete(i)
+    results_view.clear()
     progress_box.config(state="normal")
     progress_box.delete("1.0", tk.END)
     progress_box.config(state="disabled")
     git_pull_current()
-    info("Cleared results and pulled latest on current branch.")
+    info("Cleared results; pulling latest on current branch...")
 btn_clear_pull = ttk.Button(mid_frame, text="Clear & Pull", command=clear_results_and_pull)
 btn_clear_pull.grid(row=1, column=3, sticky="w", padx=(0, 6), pady=(0, 6))
 
@@ -1032,11 +1654,10 @@ status_combo.grid(row=0, column=3, sticky="w")
 clear_filter_btn = ttk.Button(filter_bar, text="Clear", command=clear_results_filters)
 clear_filter_btn.grid(row=0, column=4, sticky="w", padx=(12,0))
 
-# Wire filter controls to the filter function
-filter_entry.bind("<KeyRelease>", apply_results_filter)
+# Wire filter controls to the filter function; the text var covers typing
+# and programmatic changes, debounced
 status_combo.bind("<<ComboboxSelected>>", apply_results_filter)
-# Also react when the var is changed programmatically
-results_search_var.trace_add("write", lambda *args: apply_results_filter())
+results_search_var.trace_add("write", schedule_results_filter)
 
 # Results Treeview
 tree_container = ttk.Frame(results_frame)
@@ -1066,22 +1687,17 @@ results_tree.tag_configure("even", background=PANEL_BG)
 results_tree.tag_configure("odd", background=BG)
 
 # Scrollbars
-tree_vsb = ttk.Scrollbar(tree_container, orient="vertical", command=results_tree.yview)
+tree_vsb = ttk.Scrollbar(tree_container, orient="vertical")
 tree_hsb = ttk.Scrollbar(tree_container, orient="horizontal", command=results_tree.xview)
-results_tree.configure(yscrollcommand=tree_vsb.set, xscrollcommand=tree_hsb.set)
+results_tree.configure(xscrollcommand=tree_hsb.set)
+results_view = VirtualResultsView(results_tree, tree_vsb, results_headers)
 results_tree.grid(row=0, column=0, sticky="nsew")
 tree_vsb.grid(row=0, column=1, sticky="ns")
 tree_hsb.grid(row=1, column=0, sticky="ew")
 
 # Click-to-sort
 def treeview_sort_by(col, descending=False):
-    data = [(results_tree.set(k, col), k) for k in results_tree.get_children("")]
-    try:
-        data.sort(key=lambda t: (t[0] or "").lower(), reverse=descending)
-    except Exception:
-        data.sort(reverse=descending)
-    for idx, (_, k) in enumerate(data):
-        results_tree.move(k, "", idx)
+    results_view.sort_by(col, descending)
     # toggle on next click
     results_tree.heading(col, command=lambda c=col: treeview_sort_by(c, not descending))
 for h in results_headers:
@@ -1089,41 +1705,30 @@ for h in results_headers:
 
 # Context menu
 def copy_selected_rows():
-    sel = results_tree.selection()
+    sel = results_view.selected_rows()
     if not sel:
         return
     lines = []
-    for item in sel:
-        vals = results_tree.item(item, "values")
-        lines.append("\t".join(map(str, vals)))
+    for row in sel:
+        lines.append("\t".join(str(row.get(h, "")) for h in results_headers))
     root.clipboard_clear()
     root.clipboard_append("\n".join(lines))
 
 
 def copy_switch_name():
-    sel = results_tree.selection()
+    sel = results_view.selected_rows()
     if not sel:
         return
-    vals = results_tree.item(sel[0], "values")
-    if vals:
-        try:
-            switch_name = vals[results_headers.index("Switch Name")]
-            root.clipboard_clear()
-            root.clipboard_append(switch_name)
-        except Exception:
-            pass
+    switch_name = sel[0].get("Switch Name", "")
+    if switch_name:
+        root.clipboard_clear()
+        root.clipboard_append(switch_name)
             
 def open_matched_file():
-    sel = results_tree.selection()
+    sel = results_view.selected_rows()
     if not sel:
         return
-    vals = results_tree.item(sel[0], "values")
-    matched = ""
-    if vals:
-        try:
-            matched = vals[results_headers.index("MatchedFiles")]
-        except Exception:
-            matched = ""
+    matched = sel[0].get("MatchedFiles", "")
     if not matched:
         messagebox.showinfo("Open", "No matched file recorded for this row.")
         return
@@ -1153,13 +1758,21 @@ tree_menu.add_command(label="Open matched XML", command=open_matched_file)
 def on_tree_right_click(event):
     iid = results_tree.identify_row(event.y)
     if iid:
-        results_tree.selection_set(iid)
+        results_view.select_only(int(iid))
     tree_menu.tk_popup(event.x_root, event.y_root)
 results_tree.bind("<Button-3>", on_tree_right_click)
 
 # Consoles: Git & Validation progress
 ttk.Label(console_frame, text="Git progress").grid(row=0, column=0, sticky="w", padx=6, pady=(6, 0))
-ttk.Label(console_frame, text="Validation progress").grid(row=0, column=1, sticky="w", padx=6, pady=(6, 0))
+progress_header = ttk.Frame(console_frame)
+progress_header.grid(row=0, column=1, sticky="ew", padx=6, pady=(6, 0))
+progress_header.grid_columnconfigure(0, weight=1)
+ttk.Label(progress_header, text="Validation progress").grid(row=0, column=0, sticky="w")
+ttk.Combobox(
+    progress_header, state="readonly", values=["All", "Failures + summary"],
+    textvariable=progress_verbosity, width=18
+).grid(row=0, column=1, sticky="e", padx=(6, 6))
+ttk.Button(progress_header, text="Full log", command=open_progress_log).grid(row=0, column=2, sticky="e")
 
 git_container = ttk.Frame(console_frame)
 git_container.grid(row=1, column=0, sticky="nsew", padx=6, pady=6)
@@ -1173,6 +1786,8 @@ git_box.grid(row=0, column=0, sticky="nsew")
 git_vsb.grid(row=0, column=1, sticky="ns")
 git_hsb.grid(row=1, column=0, sticky="ew")
 git_box.config(state="disabled")
+git_box.tag_config("ok", foreground=GOOD)
+git_box.tag_config("err", foreground=BAD)
 
 progress_container = ttk.Frame(console_frame)
 progress_container.grid(row=1, column=1, sticky="nsew", padx=6, pady=6)
@@ -1186,6 +1801,8 @@ progress_box.grid(row=0, column=0, sticky="nsew")
 prog_vsb.grid(row=0, column=1, sticky="ns")
 prog_hsb.grid(row=1, column=0, sticky="ew")
 progress_box.config(state="disabled")
+progress_box.tag_config("ok", foreground=GOOD)
+progress_box.tag_config("err", foreground=BAD)
 
 # Status line with progress and cancel
 status_bar = ttk.Frame(root)
@@ -1218,6 +1835,8 @@ branches = load_branches_from_config()
 branch_combo["values"] = branches
 if _settings.get("csv_path"):
     csv_path_var.set(_settings["csv_path"])
+if _settings.get("progress_verbosity") in ("All", "Failures + summary"):
+    progress_verbosity.set(_settings["progress_verbosity"])
 
 info("Ready.")
 
@@ -1227,7 +1846,7 @@ root.bind_all("<F5>", lambda e: start_validation_thread())
 root.bind_all("<Escape>", lambda e: cancel_validation())
 
 # Start the UI pump and set close handler
-root.after(50, ui_pump)
+root.after(UI_FRAME_MS, ui_pump)
 root.protocol("WM_DELETE_WINDOW", on_close)
 
 root.update_idletasks()
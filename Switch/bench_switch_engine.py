@@ -0,0 +1,293 @@
+"""
+Benchmarks for the FUT switch validation engine.
+
+Generates reproducible synthetic build/refdata/FUT_Switch_Config trees modeled
+on Switch_BUS_CHANNEL_REPORT.xml (SiebelMessage/ListOfVfFutSwitchIo/
+VfFutSwitchBc) plus matching CSVs with hit, miss and multi-match rows, then
+times each engine phase and prints one JSON object per phase:
+
+    python bench_switch_engine.py --sizes 1000 10000 --rows 3000 --output bench.json
+
+Fields: phase, files, items, seconds, items_per_sec, peak_py_bytes
+(tracemalloc peak of this process; pool workers are not included) and
+max_rss_bytes where the platform reports it. Each phase runs twice: an
+untraced pass gives the seconds, a tracemalloc pass the peak.
+"""
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import switch_engine
+from switch_engine import (
+    SwitchXmlIndex, XmlFieldCache, VALIDATION_FIELDS, get_text, parse_xml_text,
+    extract_switch_fields, iter_switch_fields, run_validation, XPATH_REFERENCE, XPATH_SWITCH,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SWITCH_XML_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?><SiebelMessage
+ MessageId="{message_id}"
+ IntObjectName="Switch IO"
+ MessageType="Integration Object"
+ IntObjectFormat="Siebel Hierarchical"
+><ListOfVfFutSwitchIo
+><VfFutSwitchBc
+><Active
+>{active}</Active
+><Behaviour
+>{behaviour}</Behaviour
+><BehaviourType
+>Inclusion</BehaviourType
+><Comments
+>{comments}</Comments
+><EndDate
+></EndDate
+><IsChild
+></IsChild
+><IsMaster
+></IsMaster
+><MasterReference
+></MasterReference
+><ObjectName
+></ObjectName
+><ObjectType
+></ObjectType
+><Reference
+>{reference}</Reference
+><StartDate
+>{start_date}</StartDate
+><Switch
+>{switch}</Switch
+><ProductFamily
+>{family}</ProductFamily
+><Release
+>{release}</Release
+><ListOfVfFutSwitchChildBc
+>{children}</ListOfVfFutSwitchChildBc
+></VfFutSwitchBc
+></ListOfVfFutSwitchIo
+></SiebelMessage
+>
+"""
+
+CHILD_TEMPLATE = """<VfFutSwitchChildBc
+><Active
+>Y</Active
+><Name
+>{name}</Name
+><Type
+>Division</Type
+></VfFutSwitchChildBc
+>"""
+
+WORDS = ["BUS", "CHANNEL", "REPORT", "ORDER", "BILLING", "MOBILE", "FIXED", "PORTING",
+         "SIM", "SWAP", "CREDIT", "CHECK", "ROAMING", "BUNDLE", "UPGRADE", "RETENTION",
+         "ASSET", "QUOTE", "CASE", "NOTIFY", "SMS", "EMAIL", "DD", "PAYMENT", "FRAUD"]
+DIVISIONS = ["FUT", "Pilot Division 1", "Pilot Division 2", "Consumer", "Enterprise", "SoHo"]
+RELEASES = ["24.10", "25.1", "25.2", "25.3", "25.5", "25.7"]
+
+
+# ----------------------------- Synthetic data -----------------------------
+def _reference(rng, i):
+    return "_".join(rng.sample(WORDS, rng.randint(2, 4))) + f"_{i:06d}"
+
+def generate_fut_tree(xml_dir, files, seed=1):
+    """
+    Write `files` switch XMLs into xml_dir. Roughly 2% of switches also get a
+    second file whose name extends the first one (..._EXT), which makes the
+    base name a multi-match. Returns [(reference, switch_value)].
+    """
+    rng = random.Random(seed)
+    os.makedirs(xml_dir, exist_ok=True)
+    switches = []
+    i = 0
+    while i < files:
+        ref = _reference(rng, i)
+        refs = [ref, ref + "_EXT"] if rng.random() < 0.02 and i + 1 < files else [ref]
+        for r in refs:
+            value = rng.choice(["ON", "OFF"])
+            children = "".join(CHILD_TEMPLATE.format(name=d) for d in rng.sample(DIVISIONS, rng.randint(1, 3)))
+            with open(os.path.join(xml_dir, f"Switch_{r}.xml"), "w", encoding="utf-8") as f:
+                f.write(SWITCH_XML_TEMPLATE.format(
+                    message_id=f"1-{i:X}", active=rng.choice("YN"),
+                    behaviour=rng.choice(["Enable", "Disable"]),
+                    comments=" ".join(rng.sample(WORDS, 5)).lower(),
+                    reference=r, start_date=rng.choice(["", "01/01/2025"]),
+                    switch=value, family=rng.choice(["Mobile", "Fixed"]),
+                    release=rng.choice(RELEASES), children=children,
+                ))
+            switches.append((r, value))
+            i += 1
+    return switches
+
+def generate_switch_csv(csv_path, switches, rows, seed=2, miss=0.1, multi=0.05, mismatch=0.1):
+    """CSV in the validator's input format: hits, value mismatches, misses and multi-matches."""
+    rng = random.Random(seed)
+    multi_refs = [r[:-4] for r, _ in switches if r.endswith("_EXT")]
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["ADO Reference", "Release", "Switch Name", "Divisions", "Value", "Status"])
+        for i in range(rows):
+            roll = rng.random()
+            if roll < miss:
+                name, value = f"NO_SUCH_SWITCH_{i}", "ON"
+            elif roll < miss + multi and multi_refs:
+                name, value = rng.choice(multi_refs), "ON"
+            else:
+                name, value = rng.choice(switches)
+                if rng.random() < mismatch:
+                    value = "OFF" if value == "ON" else "ON"
+            w.writerow([f"BUG {100000 + i}", rng.choice(RELEASES), name, "FUT", value, ""])
+
+
+# ----------------------------- Measurement -----------------------------
+def _max_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def measure(phase, files, items, fn, setup=None):
+    """
+    Time fn() in an untraced pass, then run it again under tracemalloc for
+    the peak: tracing slows allocation-heavy code several times over.
+    setup() runs before each pass to reset any state fn() changes.
+    """
+    if setup:
+        setup()
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "phase": phase,
+        "files": files,
+        "items": items,
+        "seconds": round(seconds, 6),
+        "items_per_sec": round(items / seconds, 1) if seconds > 0 else None,
+        "peak_py_bytes": peak,
+        "max_rss_bytes": _max_rss(),
+    }
+
+def _legacy_list(xml_dir, switch_name):
+    pattern = os.path.join(xml_dir, "*.xml")
+    switch_low = (switch_name or "").lower()
+    return [p for p in glob.glob(pattern) if switch_low in os.path.basename(p).lower()]
+
+def bench_size(work, files, rows, workers, sample, phases):
+    xml_dir = os.path.join(work, f"fut_{files}", "build", "refdata", "FUT_Switch_Config")
+    csv_path = os.path.join(work, f"fut_{files}", "switches.csv")
+    if not os.path.isdir(xml_dir):
+        switches = generate_fut_tree(xml_dir, files)
+        generate_switch_csv(csv_path, switches, rows)
+    xml_files = sorted(glob.glob(os.path.join(xml_dir, "*.xml")))
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        names = [r["Switch Name"] for r in csv.DictReader(f)]
+    probe = names[:sample]
+    probe_files = xml_files[:sample]
+    out = []
+
+    def want(name):
+        return not phases or name in phases
+
+    if want("list_glob"):
+        out.append(measure("list_switch_xml_files/glob", files, len(probe),
+                           lambda: [_legacy_list(xml_dir, n) for n in probe]))
+    if want("list_index"):
+        holder = {}
+        out.append(measure("list_switch_xml_files/index_build", files, files,
+                           lambda: holder.update(idx=SwitchXmlIndex.from_dir(xml_dir))))
+        out.append(measure("list_switch_xml_files/index_lookup", files, len(names),
+                           lambda: [holder["idx"].lookup(n) for n in names]))
+    if want("parse"):
+        def full():
+            for xf in probe_files:
+                ok, root_elem, _ = parse_xml_text(xf)
+                if ok:
+                    get_text(root_elem, XPATH_REFERENCE), get_text(root_elem, XPATH_SWITCH)
+        out.append(measure("parse_xml_text/full", files, len(probe_files), full))
+        def stream():
+            for xf in probe_files:
+                with open(xf, "rb") as f:
+                    switch_engine._stream_fields(f, VALIDATION_FIELDS)
+        out.append(measure("parse_xml_text/stream", files, len(probe_files), stream))
+        out.append(measure("parse_xml_text/extract", files, len(probe_files),
+                           lambda: [extract_switch_fields(xf, VALIDATION_FIELDS) for xf in probe_files]))
+    if want("validate"):
+        cache_path = os.path.join(work, f"fut_{files}", "cache.sqlite")
+        result_path = os.path.join(work, f"fut_{files}", "result.csv")
+        caches = {}
+
+        def cold_cache():
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            caches["cache"] = XmlFieldCache(cache_path)
+
+        def warm_cache():
+            caches["cache"] = XmlFieldCache(cache_path)
+
+        out.append(measure("process_validation/no_cache", files, rows,
+                           lambda: run_validation(csv_path, xml_dir, result_path)))
+        out.append(measure("process_validation/cache_cold", files, rows,
+                           lambda: run_validation(csv_path, xml_dir, result_path, cache=caches["cache"]),
+                           setup=cold_cache))
+        out.append(measure("process_validation/cache_warm", files, rows,
+                           lambda: run_validation(csv_path, xml_dir, result_path, cache=caches["cache"]),
+                           setup=warm_cache))
+    if want("generate"):
+        out.append(measure("generate_switch_details/serial", files, files,
+                           lambda: sum(1 for _ in iter_switch_fields(xml_files, workers=1))))
+        if workers > 1:
+            out.append(measure(f"generate_switch_details/pool{workers}", files, files,
+                               lambda: sum(1 for _ in iter_switch_fields(xml_files, workers=workers))))
+    return out
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark the FUT switch validation engine.")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="XML files per tree (e.g. 1000 10000 100000)")
+    p.add_argument("--rows", type=int, default=3000, help="CSV rows per tree")
+    p.add_argument("--sample", type=int, default=300, help="Rows/files used for the per-item legacy phases")
+    p.add_argument("--workers", type=int, default=switch_engine.default_workers(), help="Pool size for the generate phase")
+    p.add_argument("--phases", nargs="*", default=[], help="Subset of: list_glob list_index parse validate generate")
+    p.add_argument("--workdir", help="Keep generated trees here (reused between runs)")
+    p.add_argument("--output", help="Also write the JSON lines to this file")
+    args = p.parse_args(argv)
+
+    work = args.workdir or tempfile.mkdtemp(prefix="fut_bench_")
+    results = []
+    try:
+        for files in args.sizes:
+            for r in bench_size(work, files, args.rows, args.workers, args.sample, set(args.phases)):
+                print(json.dumps(r), flush=True)
+                results.append(r)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(work, ignore_errors=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Repository metadata read straight from .git, without spawning git.
+
+On Windows machines with on-access scanning every git process costs a few
+hundred milliseconds, so the branch label and the repository list are read
+from .git/HEAD (following worktree/submodule "gitdir:" files) and a cached
+scan of the parent folder. The git CLI is only used for layouts this does not
+understand.
+"""
+import os
+import subprocess
+
+_repo_scan_cache = {}   # parent dir -> (mtime_ns, [repo names])
+
+
+def git_dir(repo_path):
+    """The repository's git directory, following a "gitdir: ..." file; None if not a repo."""
+    dot_git = os.path.join(repo_path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    if os.path.isfile(dot_git):
+        try:
+            with open(dot_git, "r", encoding="utf-8") as f:
+                line = f.readline().strip()
+        except OSError:
+            return None
+        if line.startswith("gitdir:"):
+            path = line[len("gitdir:"):].strip()
+            if not os.path.isabs(path):
+                path = os.path.join(repo_path, path)
+            path = os.path.normpath(path)
+            return path if os.path.isdir(path) else None
+    return None
+
+def _git_cli_branch(repo_path):
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_path,
+            capture_output=True, text=True, timeout=30
+        )
+        return out.stdout.strip() if out.returncode == 0 else None
+    except Exception:
+        return None
+
+def current_branch(repo_path):
+    """
+    Same answer as `git rev-parse --abbrev-ref HEAD`: the branch name, or
+    "HEAD" when detached. Returns "Unknown" when neither .git nor git can tell.
+    """
+    gd = git_dir(repo_path)
+    head = None
+    if gd:
+        try:
+            with open(os.path.join(gd, "HEAD"), "r", encoding="utf-8") as f:
+                head = f.readline().strip()
+        except OSError:
+            head = None
+    if head:
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/"):]
+        if len(head) in (40, 64) and all(c in "0123456789abcdef" for c in head):
+            return "HEAD"
+    # symbolic ref outside refs/heads, reftable, unreadable HEAD...
+    return _git_cli_branch(repo_path) or "Unknown"
+
+def find_git_repos(parent_dir):
+    """
+    Names of the git repositories directly under parent_dir, sorted. The scan
+    is cached until the parent folder's mtime changes (a repo added, removed
+    or renamed).
+    """
+    try:
+        mtime = os.stat(parent_dir).st_mtime_ns
+    except OSError:
+        return []
+    cached = _repo_scan_cache.get(parent_dir)
+    if cached and cached[0] == mtime:
+        return list(cached[1])
+    repos = []
+    try:
+        with os.scandir(parent_dir) as it:
+            for entry in it:
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, ".git")):
+                    repos.append(entry.name)
+    except OSError:
+        return []
+    repos.sort()
+    _repo_scan_cache[parent_dir] = (mtime, repos)
+    return list(repos)
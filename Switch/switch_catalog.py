@@ -0,0 +1,542 @@
+"""
+On-disk switch catalog (SQLite) per git tree of build/refdata/FUT_Switch_Config.
+
+The XML folder content is fully determined by the checked-out commit, so the
+extracted fields of every switch are stored once per folder tree SHA. Any
+later validation, search or "Generate switch details" on a commit with the
+same folder tree (including switching back to a branch seen before) reads the
+catalog instead of the files. A folder with local changes is never cataloged.
+
+The same git view of the folder drives incremental revalidation: only CSV
+rows whose switch name matches an XML changed since the last validated commit
+are checked again.
+"""
+import os
+import json
+import glob
+import time
+import sqlite3
+import subprocess
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from switch_engine import ALL_FIELDS, file_sha1, iter_switch_fields, extract_switch_fields_from_bytes
+
+CATALOG_FIELDS = ALL_FIELDS
+_COLUMNS = {
+    "Reference": "reference",
+    "Switch": "switch",
+    "Release": "release",
+    "Active": "active",
+    "StartDate": "start_date",
+    "EndDate": "end_date",
+    "Divisions": "divisions",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalogs (
+    tree_sha   TEXT PRIMARY KEY,
+    commit_sha TEXT,
+    xml_rel    TEXT,
+    files      INTEGER,
+    built_at   REAL,
+    last_used  REAL
+);
+CREATE TABLE IF NOT EXISTS switches (
+    tree_sha   TEXT NOT NULL,
+    ord        INTEGER NOT NULL,
+    file       TEXT NOT NULL,
+    ok         INTEGER NOT NULL,
+    error      TEXT,
+    reference  TEXT,
+    switch     TEXT,
+    release    TEXT,
+    active     TEXT,
+    start_date TEXT,
+    end_date   TEXT,
+    divisions  TEXT,
+    PRIMARY KEY (tree_sha, file)
+);
+CREATE INDEX IF NOT EXISTS switches_reference ON switches (tree_sha, reference);
+"""
+
+
+# ----------------------------- Git identity of the XML folder -----------------------------
+def _git(args, repo_path, timeout=60):
+    try:
+        out = subprocess.run(
+            ["git"] + args, cwd=repo_path, capture_output=True, text=True, timeout=timeout
+        )
+        return (out.returncode == 0, out.stdout)
+    except Exception as e:
+        return (False, str(e))
+
+def xml_rel_path(repo_path, xml_dir):
+    """The XML folder relative to the repo root in git's "/" form; starts with ".." when outside it."""
+    try:
+        rel = os.path.relpath(os.path.abspath(xml_dir), os.path.abspath(repo_path))
+    except ValueError:
+        return ".."  # another drive on Windows
+    return rel.replace(os.sep, "/")
+
+def xml_tree_id(repo_path, xml_dir):
+    """
+    Return (commit_sha, tree_sha, xml_rel) for the XML folder at HEAD, or None
+    when the folder is outside the repo, untracked or has local changes.
+    """
+    rel = xml_rel_path(repo_path, xml_dir)
+    if rel.startswith(".."):
+        return None
+    ok, out = _git(["rev-parse", "HEAD", f"HEAD:{rel}"], repo_path)
+    lines = out.split()
+    if not ok or len(lines) != 2:
+        return None
+    ok, status = _git(["status", "--porcelain", "--untracked-files=all", "--", rel], repo_path)
+    if not ok or status.strip():
+        return None
+    return (lines[0], lines[1], rel)
+
+
+def ref_xml_tree(repo_path, ref, xml_rel):
+    """Return (commit_sha, tree_sha) of the XML folder at ref, or None if either is unknown."""
+    ok, out = _git(["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], repo_path)
+    if not ok or not out.strip():
+        return None
+    commit_sha = out.strip()
+    ok, out = _git(["rev-parse", "--verify", "--quiet", f"{commit_sha}:{xml_rel}"], repo_path)
+    if not ok or not out.strip():
+        return None
+    return (commit_sha, out.strip())
+
+def list_tree_xml(repo_path, tree_sha):
+    """[(file name, blob sha)] of the *.xml blobs directly in a tree."""
+    ok, out = _git(["ls-tree", "-z", tree_sha], repo_path)
+    if not ok:
+        return None
+    entries = []
+    for item in out.split("\0"):
+        if not item:
+            continue
+        meta, _, name = item.partition("\t")
+        parts = meta.split()
+        if len(parts) == 3 and parts[1] == "blob" and name.lower().endswith(".xml"):
+            entries.append((name, parts[2]))
+    return entries
+
+
+class GitObjectReader:
+    """
+    One long-lived `git cat-file --batch` process. Requests are written from a
+    helper thread while replies are read, so thousands of blobs stream through
+    a single pipe without a git spawn (or a round trip) per file.
+    """
+
+    def __init__(self, repo_path):
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=repo_path,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self._unread = 0   # replies requested but not read yet
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._unread:
+            # abandoned mid-stream (cancel): cat-file is blocked writing replies nobody will read
+            self.proc.kill()
+        for pipe in (self.proc.stdin, self.proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+    def read_many(self, object_ids):
+        """Yield (object_id, bytes or None when missing) in request order."""
+        object_ids = list(object_ids)
+        self._unread += len(object_ids)
+
+        def feed():
+            try:
+                for oid in object_ids:
+                    self.proc.stdin.write(oid.encode("ascii") + b"\n")
+                self.proc.stdin.flush()
+            except (OSError, ValueError):
+                pass  # closed by close() after a cancel
+        threading.Thread(target=feed, daemon=True).start()
+        out = self.proc.stdout
+        for oid in object_ids:
+            header = out.readline().split()
+            if not header:
+                raise OSError("git cat-file exited early")
+            if header[-1] == b"missing":
+                self._unread -= 1
+                yield oid, None
+                continue
+            data = out.read(int(header[2]))
+            out.read(1)  # trailing newline
+            self._unread -= 1
+            yield oid, data
+
+# ----------------------------- Catalog store -----------------------------
+class CatalogView:
+    """Switch records of one catalog, in folder listing order, keyed by path."""
+
+    def __init__(self, xml_dir, records, tree_sha=None):
+        self.xml_dir = xml_dir
+        self.tree_sha = tree_sha
+        self.paths = []
+        self._fields = {}
+        for name, ok, fields_or_err in records:
+            path = os.path.join(xml_dir, name)
+            self.paths.append(path)
+            self._fields[path] = (ok, fields_or_err)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def fields_of(self, path, names=None):
+        return self._fields.get(path) or (False, f"XML parse error in {os.path.basename(path)}: not in catalog")
+
+
+class SwitchCatalog:
+    """SQLite file holding one switch catalog per XML folder tree SHA (LRU bounded)."""
+
+    def __init__(self, db_path, max_catalogs=30):
+        self.db_path = db_path
+        self.max_catalogs = max_catalogs
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, tree_sha):
+        """Return [(file, ok, fields_or_error)] in listing order, or None."""
+        cols = ", ".join(_COLUMNS[n] for n in CATALOG_FIELDS)
+        with self._lock, self._connect() as conn:
+            if conn.execute("SELECT 1 FROM catalogs WHERE tree_sha = ?", (tree_sha,)).fetchone() is None:
+                return None
+            conn.execute("UPDATE catalogs SET last_used = ? WHERE tree_sha = ?", (time.time(), tree_sha))
+            rows = conn.execute(
+                f"SELECT file, ok, error, {cols} FROM switches WHERE tree_sha = ? ORDER BY ord",
+                (tree_sha,)
+            ).fetchall()
+        records = []
+        for file, ok, error, *values in rows:
+            if ok:
+                records.append((file, True, dict(zip(CATALOG_FIELDS, values))))
+            else:
+                records.append((file, False, error))
+        return records
+
+    def store(self, tree_sha, commit_sha, xml_rel, records):
+        """Save [(file, ok, fields_or_error)] as the catalog of tree_sha."""
+        placeholders = ", ".join("?" for _ in CATALOG_FIELDS)
+        cols = ", ".join(_COLUMNS[n] for n in CATALOG_FIELDS)
+        rows = []
+        for i, (file, ok, fields_or_err) in enumerate(records):
+            if ok:
+                rows.append((tree_sha, i, file, 1, None) + tuple(fields_or_err.get(n) for n in CATALOG_FIELDS))
+            else:
+                rows.append((tree_sha, i, file, 0, fields_or_err) + (None,) * len(CATALOG_FIELDS))
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM switches WHERE tree_sha = ?", (tree_sha,))
+            conn.executemany(
+                f"INSERT INTO switches (tree_sha, ord, file, ok, error, {cols}) "
+                f"VALUES (?, ?, ?, ?, ?, {placeholders})",
+                rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO catalogs VALUES (?, ?, ?, ?, ?, ?)",
+                (tree_sha, commit_sha, xml_rel, len(rows), now, now)
+            )
+            stale = conn.execute(
+                "SELECT tree_sha FROM catalogs ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                (self.max_catalogs,)
+            ).fetchall()
+            for (sha,) in stale:
+                conn.execute("DELETE FROM switches WHERE tree_sha = ?", (sha,))
+                conn.execute("DELETE FROM catalogs WHERE tree_sha = ?", (sha,))
+
+
+def open_catalog_view(catalog, repo_path, xml_dir, build=True, cache=None, workers=None,
+                      cancel_event=None, progress=None):
+    """
+    CatalogView for the XML folder at HEAD. Loads the stored catalog for the
+    folder's tree SHA; otherwise (when build is set) extracts every file once
+    and stores it. Returns None when the folder cannot be cataloged (local
+    changes, not a git checkout) or the build was cancelled.
+    """
+    progress = progress or (lambda msg, ok=True: None)
+    ident = xml_tree_id(repo_path, xml_dir)
+    if ident is None:
+        progress("Switch catalog: XML folder has local changes or is not tracked; reading files.", True)
+        return None
+    commit_sha, tree_sha, xml_rel = ident
+    records = catalog.load(tree_sha)
+    if records is not None:
+        progress(f"Switch catalog: {len(records)} switches for {commit_sha[:10]} (tree {tree_sha[:10]})", True)
+        return CatalogView(xml_dir, records, tree_sha)
+    if not build:
+        return None
+
+    xml_files = glob.glob(os.path.join(xml_dir, "*.xml"))
+    progress(f"Switch catalog: building for {commit_sha[:10]} ({len(xml_files)} files)...", True)
+    records = []
+    for xf, ok, fields_or_err in iter_switch_fields(
+            xml_files, cache=cache, workers=workers, cancel_event=cancel_event, names=CATALOG_FIELDS):
+        records.append((os.path.basename(xf), ok, fields_or_err))
+    if cache is not None:
+        # run_validation gets no cache while a catalog view is active, so nothing else saves it
+        cache.save()
+    if len(records) != len(xml_files):
+        return None
+    catalog.store(tree_sha, commit_sha, xml_rel, records)
+    progress(f"Switch catalog: stored {len(records)} switches.", True)
+    return CatalogView(xml_dir, records, tree_sha)
+
+
+def open_ref_view(catalog, repo_path, ref, xml_dir, cancel_event=None, progress=None):
+    """
+    CatalogView of the XML folder as it is at `ref` (a branch, tag, remote
+    branch or SHA), read from git objects: nothing is checked out and the
+    working tree is not touched. Uses the stored catalog when the folder tree
+    was seen before. Returns None if the ref or folder is unknown or on cancel.
+    """
+    return open_ref_views(catalog, repo_path, {ref: ref}, xml_dir, cancel_event, progress, workers=1).get(ref)
+
+
+def _extract_blobs(repo_path, blobs, cancel_event=None, workers=4):
+    """
+    {blob sha: (ok, fields_or_error, name)} for {blob sha: file name}. The
+    blobs are split into disjoint shares, one cat-file reader per share. Only
+    the cat-file I/O overlaps; the parsing holds the GIL, so the threads add
+    no CPU parallelism. Returns None on cancel.
+    """
+    items = sorted(blobs.items())
+    shares = [items[i::workers] for i in range(max(1, min(workers, len(items))))]
+    memo = {}
+
+    def extract(share):
+        with GitObjectReader(repo_path) as reader:
+            for (sha, name), (_, data) in zip(share, reader.read_many(sha for sha, _ in share)):
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                if data is None:
+                    memo[sha] = (False, "blob missing", name)
+                else:
+                    memo[sha] = extract_switch_fields_from_bytes(data, name, CATALOG_FIELDS) + (name,)
+        return True
+
+    with ThreadPoolExecutor(max_workers=len(shares)) as pool:
+        done = list(pool.map(extract, shares))
+    return memo if all(done) else None
+
+def _tree_records(entries, memo):
+    records = []
+    for name, sha in entries:
+        ok, fields_or_err, extracted_as = memo[sha]
+        if not ok:
+            # the error names the file the blob was extracted as; name this one instead
+            prefix = f"XML parse error in {extracted_as}: "
+            detail = fields_or_err[len(prefix):] if fields_or_err.startswith(prefix) else fields_or_err
+            fields_or_err = f"XML parse error in {name}: {detail}"
+        records.append((name, ok, fields_or_err))
+    return records
+
+def open_ref_views(catalog, repo_path, refs, xml_dir, cancel_event=None, progress=None, workers=4):
+    """
+    {label: CatalogView} for {label: ref}. Every ref is resolved to its folder
+    tree first: refs on the same tree share one view and trees already in the
+    catalog are loaded. The distinct blobs of all remaining trees are then
+    extracted once, split over `workers` cat-file readers. Labels whose ref
+    or folder listing cannot be read are left out, and nothing is stored for
+    them; returns {} on cancel.
+    """
+    progress = progress or (lambda msg, ok=True: None)
+    rel = xml_rel_path(repo_path, xml_dir)
+    label_tree = {}
+    trees = {}   # tree sha -> (commit sha, first ref seen on it)
+    for label, ref in refs.items():
+        ident = None if rel.startswith("..") else ref_xml_tree(repo_path, ref, rel)
+        if ident is None:
+            progress(f"Git ref: {ref} not found or has no {rel}", False)
+            continue
+        commit_sha, tree_sha = ident
+        label_tree[label] = tree_sha
+        trees.setdefault(tree_sha, (commit_sha, ref))
+
+    views = {}
+    todo = {}   # tree sha -> [(file name, blob sha)]
+    for tree_sha, (commit_sha, ref) in trees.items():
+        records = catalog.load(tree_sha)
+        if records is not None:
+            progress(f"Switch catalog: {len(records)} switches for {ref} @ {commit_sha[:10]}", True)
+            views[tree_sha] = CatalogView(xml_dir, records, tree_sha)
+        else:
+            entries = list_tree_xml(repo_path, tree_sha)
+            if entries is None:
+                # an ls-tree failure must not be catalogued as an empty folder
+                progress(f"Git ref: cannot list {rel} of {ref}", False)
+                continue
+            todo[tree_sha] = entries
+
+    if todo:
+        blobs = {}
+        for entries in todo.values():
+            for name, sha in entries:
+                blobs.setdefault(sha, name)
+        listed = sum(len(entries) for entries in todo.values())
+        names = ", ".join(trees[t][1] for t in todo)
+        progress(f"Git ref: reading {len(blobs)} XMLs of {names} from git objects "
+                 f"({listed - len(blobs)} shared between branches)...", True)
+        memo = _extract_blobs(repo_path, blobs, cancel_event, workers)
+        if memo is None:
+            return {}
+        for tree_sha, entries in todo.items():
+            commit_sha, ref = trees[tree_sha]
+            records = _tree_records(entries, memo)
+            catalog.store(tree_sha, commit_sha, rel, records)
+            progress(f"Switch catalog: stored {len(records)} switches for {ref}.", True)
+            views[tree_sha] = CatalogView(xml_dir, records, tree_sha)
+    return {label: views[tree_sha] for label, tree_sha in label_tree.items() if tree_sha in views}
+
+
+# ----------------------------- Incremental revalidation -----------------------------
+def _git_z_paths(args, repo_path):
+    ok, out = _git(args, repo_path)
+    if not ok:
+        return None
+    return [p for p in out.split("\0") if p]
+
+def _xml_basenames(paths, xml_rel):
+    """Lower-cased names of the direct *.xml children of xml_rel among paths."""
+    prefix = xml_rel.rstrip("/") + "/"
+    names = set()
+    for p in paths:
+        if p.startswith(prefix):
+            name = p[len(prefix):]
+            if "/" not in name and name.lower().endswith(".xml"):
+                names.add(name.lower())
+    return names
+
+def dirty_xml_files(repo_path, xml_rel):
+    entries = _git_z_paths(
+        ["status", "--porcelain", "-z", "--no-renames", "--untracked-files=all", "--", xml_rel], repo_path
+    )
+    if entries is None:
+        return None
+    return _xml_basenames([e[3:] for e in entries], xml_rel)
+
+def changed_xml_files(repo_path, xml_rel, since_sha):
+    """XML names changed between since_sha and the working tree, or None if git cannot tell."""
+    committed = _git_z_paths(["diff", "--name-only", "-z", "--no-renames", since_sha, "HEAD", "--", xml_rel], repo_path)
+    dirty = dirty_xml_files(repo_path, xml_rel)
+    if committed is None or dirty is None:
+        return None
+    return _xml_basenames(committed, xml_rel) | dirty
+
+
+class ValidationState:
+    """
+    Last complete validation per (CSV, XML folder): the commit it ran
+    against, files that were locally modified then, and its result CSV.
+    Persisted as JSON next to the other caches.
+    """
+
+    def __init__(self, path, max_entries=200):
+        self.path = path
+        self.max_entries = max_entries
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except Exception:
+            self._data = {}
+
+    @staticmethod
+    def _key(csv_path, xml_dir):
+        return os.path.normcase(os.path.abspath(csv_path)) + "|" + os.path.normcase(os.path.abspath(xml_dir))
+
+    def get(self, csv_path, xml_dir):
+        return self._data.get(self._key(csv_path, xml_dir))
+
+    def put(self, csv_path, xml_dir, record):
+        key = self._key(csv_path, xml_dir)
+        self._data.pop(key, None)
+        self._data[key] = record
+        while len(self._data) > self.max_entries:
+            self._data.pop(next(iter(self._data)))
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+def plan_revalidation(state, repo_path, csv_path, xml_dir, progress=None):
+    """
+    Return run_validation()'s `previous` argument when only the rows touched
+    by XML changes since the last validation of this CSV need rechecking,
+    else None (full run).
+    """
+    progress = progress or (lambda msg, ok=True: None)
+    record = state.get(csv_path, xml_dir)
+    if not record:
+        return None
+    if not os.path.isfile(record.get("result_path", "")):
+        progress("Incremental: previous result file is missing; running full validation.", True)
+        return None
+    if record.get("csv_sha1") != file_sha1(csv_path):
+        progress("Incremental: CSV changed since last run; running full validation.", True)
+        return None
+    xml_rel = xml_rel_path(repo_path, xml_dir)
+    changed = changed_xml_files(repo_path, xml_rel, record["commit_sha"])
+    if changed is None:
+        progress(f"Incremental: git cannot diff against {record['commit_sha'][:10]}; running full validation.", True)
+        return None
+    changed |= set(record.get("dirty", []))
+    progress(
+        f"Incremental: {len(changed)} XML file(s) changed since {record['commit_sha'][:10]}; "
+        f"reusing other rows from {os.path.basename(record['result_path'])}", True
+    )
+    return {"result_path": record["result_path"], "changed": changed, "commit_sha": record["commit_sha"]}
+
+def record_validation(state, repo_path, csv_path, xml_dir, summary):
+    """Remember a finished (not cancelled) run as the base for the next incremental one."""
+    if summary.get("cancelled"):
+        return
+    ok, out = _git(["rev-parse", "HEAD"], repo_path)
+    if not ok:
+        return
+    xml_rel = xml_rel_path(repo_path, xml_dir)
+    dirty = dirty_xml_files(repo_path, xml_rel)
+    if dirty is None:
+        return
+    state.put(csv_path, xml_dir, {
+        "commit_sha": out.strip(),
+        "dirty": sorted(dirty),
+        "csv_sha1": file_sha1(csv_path),
+        "result_path": summary["result_path"],
+        "validated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    })
@@ -0,0 +1,935 @@
+"""
+Tk-free helpers for the FUT switch validator.
+
+Everything in here must stay importable without tkinter so it can be shared by
+the UI scripts, headless runs and worker processes.
+"""
+import io
+import os
+import sys
+import csv
+import json
+import codecs
+import glob
+import hashlib
+import sqlite3
+import queue
+import atexit
+import pickle
+import itertools
+import threading
+import subprocess
+from collections import OrderedDict
+from contextlib import closing
+import xml.etree.ElementTree as ET
+
+# XML XPaths
+XPATH_REFERENCE = "./ListOfVfFutSwitchIo/VfFutSwitchBc/Reference"
+XPATH_SWITCH = "./ListOfVfFutSwitchIo/VfFutSwitchBc/Switch"
+XPATH_CHILDREN = "./ListOfVfFutSwitchIo/VfFutSwitchBc/ListOfVfFutSwitchChildBc/VfFutSwitchChildBc"
+
+# Leaf fields extracted from every switch XML (name -> XPath)
+SWITCH_FIELDS = {
+    "Reference": XPATH_REFERENCE,
+    "Switch": XPATH_SWITCH,
+    "Release": "./ListOfVfFutSwitchIo/VfFutSwitchBc/Release",
+    "Active": "./ListOfVfFutSwitchIo/VfFutSwitchBc/Active",
+    "StartDate": "./ListOfVfFutSwitchIo/VfFutSwitchBc/StartDate",
+    "EndDate": "./ListOfVfFutSwitchIo/VfFutSwitchBc/EndDate",
+}
+
+# ----------------------------- Switch XML file index -----------------------------
+NGRAM = 3
+
+
+class SwitchXmlIndex:
+    """
+    Index over the *.xml file names of a FUT_Switch_Config directory.
+
+    Answers "which files contain this switch name" with the same
+    case-insensitive substring semantics as a per-row glob + scan, but
+    through a trigram posting list so a lookup only touches candidate files.
+    Results keep the directory listing order.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._names = [os.path.basename(p).lower() for p in self.paths]
+        self._grams = {}
+        for i, name in enumerate(self._names):
+            for gram in {name[j:j + NGRAM] for j in range(len(name) - NGRAM + 1)}:
+                self._grams.setdefault(gram, []).append(i)
+
+    @classmethod
+    def from_dir(cls, xml_dir):
+        return cls(glob.glob(os.path.join(xml_dir, "*.xml")))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def lookup(self, switch_name):
+        switch_low = (switch_name or "").lower()
+        if len(switch_low) < NGRAM:
+            candidates = range(len(self._names))
+        else:
+            postings = []
+            for j in range(len(switch_low) - NGRAM + 1):
+                ids = self._grams.get(switch_low[j:j + NGRAM])
+                if not ids:
+                    return []
+                postings.append(ids)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                candidates.intersection_update(ids)
+                if not candidates:
+                    return []
+            candidates = sorted(candidates)
+        return [self.paths[i] for i in candidates if switch_low in self._names[i]]
+
+
+# ----------------------------- XML parsing -----------------------------
+def _linear_root(content):
+    linear = " ".join(content.split())
+    return ET.fromstring(linear), linear
+
+def parse_xml_text(xml_file):
+    try:
+        with open(xml_file, "r", encoding="utf-8") as f:
+            content = f.read()
+        root_elem, linear = _linear_root(content)
+        return (True, root_elem, linear)
+    except Exception as e:
+        return (False, None, f"XML parse error in {os.path.basename(xml_file)}: {e}")
+
+def get_text(root_elem, relative_xpath):
+    node = root_elem.find(relative_xpath)
+    if node is None:
+        return None
+    return (node.text or "").strip()
+
+def read_switch_fields(root_elem, names=None):
+    """Return {field: text or None} for SWITCH_FIELDS plus the Divisions list, or just `names` of them."""
+    fields = {name: get_text(root_elem, xp) for name, xp in SWITCH_FIELDS.items() if names is None or name in names}
+    if names is None or "Divisions" in names:
+        divisions = []
+        for child in root_elem.findall(XPATH_CHILDREN):
+            if (get_text(child, "./Type") or "").lower() == "division":
+                divisions.append(get_text(child, "./Name") or "")
+        fields["Divisions"] = ", ".join(d for d in divisions if d)
+    return fields
+
+# Fields validation needs; extraction stops once these are found
+VALIDATION_FIELDS = ("Reference", "Switch")
+ALL_FIELDS = tuple(SWITCH_FIELDS) + ("Divisions",)
+STREAM_CHUNK = 64 * 1024
+# Smaller documents arrive in the first read, so streaming could not stop early
+STREAM_MIN_BYTES = STREAM_CHUNK
+
+_CHILD_PATH = tuple(XPATH_CHILDREN[2:].split("/"))
+
+
+class _Linearizer:
+    """Chunk-by-chunk equivalent of " ".join(content.split())."""
+
+    def __init__(self):
+        self.started = False
+        self.pending_space = False
+
+    def __call__(self, chunk):
+        parts = chunk.split()
+        if not parts:
+            if chunk and self.started:
+                self.pending_space = True
+            return ""
+        lead = " " if self.started and (self.pending_space or chunk[0].isspace()) else ""
+        self.started = True
+        self.pending_space = chunk[-1].isspace()
+        return lead + " ".join(parts)
+
+def _stream_fields(f, names, hasher=None):
+    """
+    Pull-parse a binary XML stream, linearized on the fly, until every
+    requested field is known. With a hasher the rest of the stream is
+    still read, only to be hashed; without one reading stops there.
+    Returns the fields dict; raises on malformed XML or bad encoding.
+    """
+    targets = {tuple(SWITCH_FIELDS[n][2:].split("/")): n for n in names if n in SWITCH_FIELDS}
+    want_divisions = "Divisions" in names
+    fields = {n: None for n in targets.values()}
+    found = set()
+    divisions = []
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    linearize = _Linearizer()
+    parser = ET.XMLPullParser(events=("start", "end"))
+    path = []
+    done = not targets and not want_divisions
+    while True:
+        data = f.read(STREAM_CHUNK)
+        if hasher is not None:
+            hasher.update(data)
+        if done:
+            if not data or hasher is None:
+                break
+            continue
+        parser.feed(linearize(decoder.decode(data, final=not data)))
+        if not data:
+            parser.close()
+        for event, elem in parser.read_events():
+            if event == "start":
+                path.append(elem.tag)
+                continue
+            rel = tuple(path[1:])
+            path.pop()
+            name = targets.get(rel)
+            if name and name not in found:
+                fields[name] = (elem.text or "").strip()
+                found.add(name)
+            elif want_divisions and rel == _CHILD_PATH:
+                if (get_text(elem, "./Type") or "").lower() == "division":
+                    divisions.append(get_text(elem, "./Name") or "")
+            if len(rel) == 3:
+                elem.clear()
+            if not want_divisions and len(found) == len(targets):
+                done = True
+                break
+        if not data or (done and hasher is None):
+            break
+    if want_divisions:
+        fields["Divisions"] = ", ".join(d for d in divisions if d)
+    return fields
+
+def _worth_streaming(size, names):
+    # Divisions are collected up to the end of the document, so only leaf fields can stop early
+    return size > STREAM_MIN_BYTES and "Divisions" not in names
+
+def extract_switch_fields(xml_file, names=ALL_FIELDS):
+    """
+    Read the requested fields of one switch XML. Returns (ok, fields) or
+    (False, error message). Large files are read with the streaming
+    early-exit reader when it can stop early; everything else, and any
+    document that does not stream cleanly, goes through parse_xml_text(),
+    so values and error messages match the full parse.
+    """
+    try:
+        if _worth_streaming(os.path.getsize(xml_file), names):
+            with open(xml_file, "rb") as f:
+                return (True, _stream_fields(f, names))
+    except Exception:
+        pass
+    ok, root_elem, lin_or_err = parse_xml_text(xml_file)
+    if not ok:
+        return (False, lin_or_err)
+    return (True, read_switch_fields(root_elem, names))
+
+def extract_switch_fields_from_bytes(data, name, names=ALL_FIELDS):
+    """extract_switch_fields() for content already in memory (a git blob); name is used in errors."""
+    try:
+        if _worth_streaming(len(data), names):
+            return (True, _stream_fields(io.BytesIO(data), names))
+    except Exception:
+        pass
+    try:
+        root_elem, _ = _linear_root(data.decode("utf-8"))
+    except Exception as e:
+        return (False, f"XML parse error in {name}: {e}")
+    return (True, read_switch_fields(root_elem, names))
+
+# ----------------------------- Persistent field cache -----------------------------
+CACHE_VERSION = 1
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS xml_fields (
+    key   TEXT PRIMARY KEY,
+    used  INTEGER NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS xml_fields_used ON xml_fields (used);
+"""
+
+def file_sha1(path):
+    hasher = hashlib.sha1()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(STREAM_CHUNK), b""):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+def _covers(entry, names):
+    return not entry["ok"] or all(n in entry["fields"] for n in names)
+
+def build_cache_entry(xml_file, previous=None, names=ALL_FIELDS):
+    """
+    Stat, hash and extract one XML into a cache entry. Runs in worker
+    processes, so it only takes and returns picklable values.
+    Returns (entry, error, parsed). When `previous` has the same size and
+    content hash and already holds `names`, it is reused without parsing.
+    """
+    err_prefix = f"XML parse error in {os.path.basename(xml_file)}: "
+    try:
+        st = os.stat(xml_file)
+        if previous and previous["size"] == st.st_size and _covers(previous, names):
+            if previous["sha1"] == file_sha1(xml_file):
+                return dict(previous, mtime_ns=st.st_mtime_ns), None, False
+        hasher = hashlib.sha1()
+        try:
+            with open(xml_file, "rb") as f:
+                ok, result = True, _stream_fields(f, names, hasher)
+            digest = hasher.hexdigest()
+        except OSError:
+            raise
+        except Exception:
+            # unexpected structure: same path (and error text) as the full parse
+            with open(xml_file, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            try:
+                root_elem, _ = _linear_root(data.decode("utf-8"))
+                ok, result = True, read_switch_fields(root_elem)
+            except Exception as e:
+                ok, result = False, err_prefix + str(e)
+    except OSError as e:
+        return None, err_prefix + str(e), False
+    if ok and previous and previous["ok"] and previous["sha1"] == digest:
+        result = dict(previous["fields"], **result)
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha1": digest,
+        "ok": ok,
+        "fields": result if ok else None,
+        "error": None if ok else result,
+    }, None, True
+
+def _entry_result(entry):
+    return (entry["ok"], entry["fields"] if entry["ok"] else entry["error"])
+
+
+class XmlFieldCache:
+    """
+    Extracted switch fields per XML file, persisted in a SQLite file between runs.
+
+    An entry is reused while the file's mtime and size are unchanged. When
+    only the mtime moved (git rewrote an identical file on switch/reset) the
+    content SHA-1 is compared before re-parsing. The file is read on first
+    use (in the worker that needs it, not at startup) and save() only writes
+    entries added or used since the last save. Least recently used entries
+    are evicted beyond max_entries. Safe to share between threads.
+    """
+
+    def __init__(self, path, max_entries=50000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._used = {}         # key -> use counter, for entries hit or stored since the last save
+        self._changed = set()   # keys whose entry must be written
+        self._clock = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read the stored entries, oldest use first; the caller holds the lock."""
+        self._loaded = True
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+                    return
+                rows = conn.execute("SELECT key, used, entry FROM xml_fields ORDER BY used").fetchall()
+        except Exception:
+            return
+        for key, used, entry in rows:
+            self._entries[key] = json.loads(entry)
+        if rows:
+            self._clock = rows[-1][1]
+
+    def _touch(self, key):
+        self._entries.move_to_end(key)
+        self._clock += 1
+        self._used[key] = self._clock
+
+    def save(self):
+        with self._lock:
+            if not self._used:
+                return
+            changed, used = [], []
+            for key, n in self._used.items():
+                if key not in self._entries:
+                    continue
+                if key in self._changed:
+                    changed.append((key, n, json.dumps(self._entries[key], separators=(",", ":"))))
+                else:
+                    used.append((n, key))
+            self._used = {}
+            self._changed = set()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+                conn.executescript(CACHE_SCHEMA)
+                if conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+                    conn.execute("DELETE FROM xml_fields")
+                    conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+                conn.executemany("INSERT OR REPLACE INTO xml_fields VALUES (?, ?, ?)", changed)
+                conn.executemany("UPDATE xml_fields SET used = ? WHERE key = ?", used)
+                conn.execute(
+                    "DELETE FROM xml_fields WHERE key IN "
+                    "(SELECT key FROM xml_fields ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except Exception:
+            pass
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key, entry):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._entries[key] = entry
+            self._touch(key)
+            self._changed.add(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _key(self, xml_file):
+        return os.path.normcase(os.path.abspath(xml_file))
+
+    def lookup(self, xml_file, names=VALIDATION_FIELDS):
+        """Return the cached entry if the file's stat still matches and it holds names."""
+        try:
+            st = os.stat(xml_file)
+        except OSError:
+            return None
+        key = self._key(xml_file)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self._entries.get(key)
+            if (entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size
+                    and _covers(entry, names)):
+                self._touch(key)
+                self.hits += 1
+                return entry
+        return None
+
+    def stale_entry(self, xml_file):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            return self._entries.get(self._key(xml_file))
+
+    def put(self, xml_file, entry, parsed=True):
+        if parsed:
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._store(self._key(xml_file), entry)
+
+    def fields_for(self, xml_file, names=VALIDATION_FIELDS):
+        """Cached equivalent of extract_switch_fields()."""
+        entry = self.lookup(xml_file, names)
+        if entry is not None:
+            return _entry_result(entry)
+        entry, err, parsed = build_cache_entry(xml_file, self.stale_entry(xml_file), names)
+        if entry is None:
+            return (False, err)
+        self.put(xml_file, entry, parsed)
+        return _entry_result(entry)
+
+# ----------------------------- Parallel extraction -----------------------------
+POOL_MIN_FILES = 64
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+class WorkerPoolError(RuntimeError):
+    """A pool worker died or answered garbage; the run using it has failed."""
+
+
+class WorkerPool:
+    """
+    `python switch_engine.py --worker` processes fed pickled job chunks over
+    their pipes.
+
+    These are plain subprocesses of this Tk-free module rather than a
+    multiprocessing pool. The validator scripts build their Tk window at
+    import time, and spawn would re-run them in every child. A worker that
+    dies is not replaced. The run using it fails with WorkerPoolError and
+    the pool is discarded.
+    """
+
+    def __init__(self, workers):
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker"]
+        self.procs = [
+            subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, creationflags=_NO_WINDOW)
+            for _ in range(workers)
+        ]
+        self.busy = False
+
+    def alive(self):
+        return all(p.poll() is None for p in self.procs)
+
+    def close(self):
+        for p in self.procs:
+            try:
+                p.kill()
+            except OSError:
+                pass
+            p.wait()
+
+    def imap(self, jobs, chunksize):
+        """Yield build_cache_entry(*job) for every job, in job order."""
+        order = queue.Queue()
+
+        def feed():
+            # chunks go round-robin; `order` tells the reader which worker answers next
+            it = iter(jobs)
+            try:
+                for i in itertools.count():
+                    chunk = list(itertools.islice(it, chunksize))
+                    if not chunk:
+                        break
+                    worker = self.procs[i % len(self.procs)]
+                    pickle.dump(chunk, worker.stdin, pickle.HIGHEST_PROTOCOL)
+                    worker.stdin.flush()
+                    order.put(worker)
+                order.put(None)
+            except Exception as e:
+                order.put(e)
+
+        threading.Thread(target=feed, daemon=True).start()
+        while True:
+            worker = order.get()
+            if worker is None:
+                return
+            if isinstance(worker, Exception):
+                raise WorkerPoolError(f"XML worker pool failed: {worker}")
+            try:
+                results = pickle.load(worker.stdout)
+            except Exception as e:
+                raise WorkerPoolError(f"XML worker stopped answering: {e!r}")
+            yield from results
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _acquire_pool(workers):
+    """The shared pool (started once and reused), or None while another run holds it."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.busy and (len(_pool.procs) != workers or not _pool.alive()):
+            _pool.close()
+            _pool = None
+        if _pool is None:
+            _pool = WorkerPool(workers)
+        elif _pool.busy:
+            return None
+        _pool.busy = True
+        return _pool
+
+def _release_pool(pool, clean):
+    """Hand the pool back; one left mid-stream (cancel, error) has unread replies, so it is closed."""
+    global _pool
+    with _pool_lock:
+        pool.busy = False
+        if not clean:
+            pool.close()
+            if _pool is pool:
+                _pool = None
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+atexit.register(shutdown_pool)
+
+def iter_switch_fields(xml_files, cache=None, workers=None, cancel_event=None, chunksize=32,
+                       names=VALIDATION_FIELDS):
+    """
+    Yield (xml_file, ok, fields_or_error) for every file, in input order.
+
+    Files with a valid cache entry are answered in-process; the rest are
+    parsed by the shared WorkerPool when there are enough of them to pay for
+    it. Stops early once cancel_event is set. Raises WorkerPoolError if a
+    worker dies.
+    """
+    workers = default_workers() if workers is None else max(1, workers)
+    pending = []
+    hits = {}
+    for xf in xml_files:
+        entry = cache.lookup(xf, names) if cache is not None else None
+        if entry is not None:
+            hits[xf] = entry
+        else:
+            pending.append(xf)
+
+    def jobs():
+        for xf in pending:
+            yield (xf, cache.stale_entry(xf) if cache is not None else None, names)
+
+    pool = _acquire_pool(workers) if workers > 1 and len(pending) >= POOL_MIN_FILES else None
+    if pool is not None:
+        built = pool.imap(jobs(), chunksize)
+    else:
+        built = map(_build_entry_job, jobs())
+    clean = False
+    try:
+        for xf in xml_files:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            entry = hits.get(xf)
+            if entry is None:
+                entry, err, parsed = next(built)
+                if entry is None:
+                    yield (xf, False, err)
+                    continue
+                if cache is not None:
+                    cache.put(xf, entry, parsed)
+            ok, result = _entry_result(entry)
+            yield (xf, ok, result)
+        clean = True
+    finally:
+        if pool is not None:
+            _release_pool(pool, clean)
+
+def _build_entry_job(job):
+    return build_cache_entry(*job)
+
+def _serve_worker():
+    """WorkerPool worker: answer pickled job chunks from stdin until it closes."""
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    while True:
+        try:
+            chunk = pickle.load(stdin)
+        except EOFError:
+            return 0
+        pickle.dump([build_cache_entry(*job) for job in chunk], stdout, pickle.HIGHEST_PROTOCOL)
+        stdout.flush()
+
+# ----------------------------- Streaming CSV I/O -----------------------------
+def count_csv_records(path):
+    """Number of data rows in a CSV as iter_csv_rows() yields them (blank lines skipped)."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return sum(1 for row in reader if row)
+
+def iter_csv_rows(path):
+    """Yield the CSV's rows as dicts without loading the file."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+def unique_stamp(directory, stamp):
+    """
+    stamp, or stamp_2, stamp_3, ... when a file in directory already carries
+    it, so a rerun within the same second never overwrites the last result.
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return stamp
+    candidate, n = stamp, 1
+    while any(f"_{candidate}." in name for name in names):
+        n += 1
+        candidate = f"{stamp}_{n}"
+    return candidate
+
+
+class ResultCsvWriter:
+    """
+    Append-as-you-go CSV writer. The header is written on open and every row
+    is flushed, so the file on disk is a valid CSV after each completed row.
+    """
+
+    def __init__(self, path, headers):
+        self.path = path
+        self.rows = 0
+        self._f = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._f, fieldnames=headers)
+        self._writer.writeheader()
+        self._f.flush()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._f.flush()
+        self.rows += 1
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ----------------------------- Validation engine -----------------------------
+REQUIRED_HEADERS = ["ADO Reference", "Release", "Switch Name", "Divisions", "Value", "Status"]
+OUT_HEADERS = [
+    "ADO Reference", "Release", "Switch Name", "Divisions", "Value",
+    "Status", "GitXmlValue", "MatchedFiles"
+]
+
+def check_csv_headers(path):
+    """Returns (ok, message) for the REQUIRED_HEADERS check of a CSV file."""
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            try:
+                headers = next(reader)
+            except StopIteration:
+                return (False, "CSV is empty.")
+    except Exception as e:
+        return (False, f"Failed to read CSV:\n{e}")
+    missing = [h for h in REQUIRED_HEADERS if h not in headers]
+    if missing:
+        return (False, f"Missing required headers: {', '.join(missing)}")
+    return (True, "CSV header validation passed.")
+
+def validate_row(row, idx, total, xml_index, fields_of, log=None, progress=None):
+    """
+    Validate one CSV row against the XML folder. Returns (out_row, is_ok, note).
+    `fields_of(path)` returns (ok, fields_or_error) for a matched XML,
+    `log` receives log-file text, `progress` receives (msg, ok) lines.
+    """
+    log = log or (lambda text: None)
+    progress = progress or (lambda msg, ok=True: None)
+    ado_ref = (row.get("ADO Reference") or "").strip()
+    release = (row.get("Release") or "").strip()
+    switch_name = (row.get("Switch Name") or "").strip()
+    divisions = (row.get("Divisions") or "").strip()
+    csv_value_raw = (row.get("Value") or "").strip()
+    csv_value_up = csv_value_raw.upper()
+
+    log(
+        f"[Row {idx}] ADO:{ado_ref} Release:{release} "
+        f"Switch:{switch_name} Divisions:{divisions} Value(csv):{csv_value_raw}\n"
+    )
+    matched_files = xml_index.lookup(switch_name)
+    log(f" Matched XML files: {matched_files if matched_files else 'None'}\n")
+
+    result_status = "FAILED"
+    git_xml_value = ""
+    note = ""
+    is_ok = False
+
+    if len(matched_files) == 0:
+        note = "No XML file found for Switch Name"
+        progress(f"[{idx}/{total}] {switch_name}: {note}", False)
+    elif len(matched_files) > 1:
+        note = "Failed: multiple files present"
+        files = ", ".join(os.path.basename(x) for x in matched_files)
+        progress(f"[{idx}/{total}] {switch_name}: {note} -> {files}", False)
+    else:
+        xml_file = matched_files[0]
+        ok_parse, fields_or_err = fields_of(xml_file)
+        if not ok_parse:
+            note = f"XML parse error: {fields_or_err}"
+            progress(f"[{idx}/{total}] {switch_name}: {note}", False)
+        else:
+            ref_text = fields_or_err["Reference"] or ""
+            sw_text = fields_or_err["Switch"] or ""
+            git_xml_value = sw_text
+            ref_ok = (switch_name.upper() == ref_text.strip().upper())
+            sw_ok = (csv_value_up == sw_text.strip().upper())
+
+            log(f" XPath Reference: {XPATH_REFERENCE} -> '{ref_text}'\n")
+            log(f" XPath Switch: {XPATH_SWITCH} -> '{sw_text}'\n")
+
+            if ref_ok and sw_ok:
+                result_status = "VALIDATED"
+                is_ok = True
+                note = "OK"
+                progress(f"[{idx}/{total}] {switch_name}: Validated", True)
+            else:
+                mism = []
+                if not ref_ok: mism.append("Reference mismatch")
+                if not sw_ok:  mism.append("Switch value mismatch")
+                note = "; ".join(mism) if mism else "Mismatch"
+                progress(f"[{idx}/{total}] {switch_name}: {note} (GIT Switch='{sw_text}')", False)
+
+    out_row = {
+        "ADO Reference": ado_ref,
+        "Release": release,
+        "Switch Name": switch_name,
+        "Divisions": divisions,
+        "Value": csv_value_raw,
+        "Status": result_status,
+        "GitXmlValue": git_xml_value,
+        "MatchedFiles": ", ".join(matched_files) if matched_files else ""
+    }
+    log(f" Result: {result_status}. Note: {note}. GitXmlValue: '{git_xml_value}'\n\n")
+    return (out_row, is_ok, note)
+
+_ROW_KEYS = ("ADO Reference", "Release", "Switch Name", "Divisions", "Value")
+
+def _can_reuse(row, prev_row, changed):
+    """A previous result row still holds if it is for the same input and no changed XML matches it."""
+    if any((row.get(k) or "").strip() != (prev_row.get(k) or "") for k in _ROW_KEYS):
+        return False
+    switch_low = (row.get("Switch Name") or "").strip().lower()
+    return not any(switch_low in name for name in changed)
+
+def run_validation(csv_path, xml_dir, result_path, log_path=None, log_header="",
+                   cache=None, cancel_event=None, progress=None, on_row=None, on_percent=None,
+                   catalog_view=None, previous=None):
+    """
+    Validate every row of csv_path against xml_dir, streaming results into
+    result_path (and log_path when given). With a catalog_view (see
+    switch_catalog) file names and fields come from it instead of the folder
+    and the cache. With `previous` (see switch_catalog.plan_revalidation)
+    rows whose switch name matches none of previous["changed"] keep their
+    row from previous["result_path"]. Callbacks:
+      progress(msg, ok)            progress console lines
+      on_row(out_row, is_ok, note) each completed row
+      on_percent(pct)              progress bar value
+    Returns a summary dict: total, processed, validated, failed, reused, cancelled.
+    """
+    progress = progress or (lambda msg, ok=True: None)
+    total = count_csv_records(csv_path)
+    progress(f"Validation started. Records: {total}", True)
+    summary = {"total": total, "processed": 0, "validated": 0, "failed": 0, "reused": 0,
+               "cancelled": False, "result_path": result_path, "log_path": log_path}
+    if previous and os.path.normcase(os.path.abspath(previous["result_path"])) == \
+            os.path.normcase(os.path.abspath(result_path)):
+        # the writer below truncates result_path before its rows could be reused
+        progress("Previous result would be overwritten; revalidating every row.", False)
+        previous = None
+    prev_rows = iter_csv_rows(previous["result_path"]) if previous else None
+
+    log_f = open(log_path, "w", encoding="utf-8") if log_path else None
+    try:
+        with ResultCsvWriter(result_path, OUT_HEADERS) as result_w:
+            if log_f:
+                log_f.write(log_header)
+            log = log_f.write if log_f else None
+
+            if catalog_view is not None:
+                xml_index = SwitchXmlIndex(catalog_view.paths)
+                fields_of = catalog_view.fields_of
+                cache = None
+            else:
+                # list the XML folder once and answer per-row lookups from the index
+                xml_index = SwitchXmlIndex.from_dir(xml_dir)
+                if cache is not None:
+                    cache.reset_stats()
+                    fields_of = cache.fields_for
+                else:
+                    fields_of = lambda path: extract_switch_fields(path, VALIDATION_FIELDS)
+            progress(f"Indexed XML files: {len(xml_index)}", True)
+
+            for idx, row in enumerate(iter_csv_rows(csv_path), start=1):
+                if cancel_event is not None and cancel_event.is_set():
+                    progress("Validation cancelled by user.", False)
+                    summary["cancelled"] = True
+                    break
+                if on_percent:
+                    on_percent((idx - 1) * 100.0 / max(1, total))
+                prev_row = next(prev_rows, None) if prev_rows is not None else None
+                if prev_row is not None and _can_reuse(row, prev_row, previous["changed"]):
+                    out_row = {h: prev_row.get(h, "") for h in OUT_HEADERS}
+                    is_ok = out_row["Status"] == "VALIDATED"
+                    note = f"Unchanged since {previous['commit_sha'][:10]}"
+                    progress(f"[{idx}/{total}] {out_row['Switch Name']}: {note} ({out_row['Status']})", is_ok)
+                    if log:
+                        log(f"[Row {idx}] Switch:{out_row['Switch Name']} {note}. Result: {out_row['Status']}\n\n")
+                    summary["reused"] += 1
+                else:
+                    out_row, is_ok, note = validate_row(row, idx, total, xml_index, fields_of, log, progress)
+                result_w.write(out_row)
+                if log_f:
+                    log_f.flush()
+                summary["processed"] += 1
+                summary["validated" if is_ok else "failed"] += 1
+                if on_row:
+                    on_row(out_row, is_ok, note)
+
+        if cache is not None:
+            cache.save()
+            progress(f"XML cache: {cache.hits} reused, {cache.misses} parsed", True)
+        if previous:
+            progress(
+                f"Incremental: {summary['processed'] - summary['reused']} row(s) revalidated, "
+                f"{summary['reused']} kept from the previous run", True
+            )
+        progress(f"Validation completed. Results saved: {result_path}", True)
+        if log_f:
+            log_f.write(f"Completed. Results: {result_path}\n")
+    finally:
+        if prev_rows is not None:
+            prev_rows.close()
+        if log_f:
+            log_f.close()
+    return summary
+
+
+def matrix_headers(labels):
+    """Result columns of run_validation_matrix: the input row, Status/GitXmlValue per label, overall Status."""
+    headers = ["ADO Reference", "Release", "Switch Name", "Divisions", "Value"]
+    for label in labels:
+        headers += [f"{label} Status", f"{label} GitXmlValue"]
+    return headers + ["Status"]
+
+def run_validation_matrix(csv_path, views, result_path, cancel_event=None, progress=None,
+                          on_row=None, on_percent=None):
+    """
+    Validate csv_path against several XML folders in one pass, e.g. one
+    switch_catalog CatalogView per release branch. `views` maps a column label
+    to a view (.paths and .fields_of). Each CSV row becomes one wide result
+    row with a Status and GitXmlValue per label and an overall Status that is
+    VALIDATED only when every label validated. Callbacks as in run_validation.
+    The labels are checked one after another on this thread: with catalog
+    views that is dictionary lookups only, the XML reading having been done
+    by open_ref_views. Returns a summary dict with per-label "validated" counts.
+    """
+    progress = progress or (lambda msg, ok=True: None)
+    labels = list(views)
+    indexes = {label: SwitchXmlIndex(views[label].paths) for label in labels}
+    total = count_csv_records(csv_path)
+    progress(f"Matrix validation started. Records: {total}, branches: {', '.join(labels)}", True)
+    summary = {"total": total, "processed": 0, "validated": 0, "failed": 0, "cancelled": False,
+               "result_path": result_path, "per_label": {label: 0 for label in labels}}
+    with ResultCsvWriter(result_path, matrix_headers(labels)) as result_w:
+        for idx, row in enumerate(iter_csv_rows(csv_path), start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                progress("Validation cancelled by user.", False)
+                summary["cancelled"] = True
+                break
+            if on_percent:
+                on_percent((idx - 1) * 100.0 / max(1, total))
+            out_row = None
+            statuses = []
+            for label in labels:
+                one, ok, _ = validate_row(row, idx, total, indexes[label], views[label].fields_of)
+                if out_row is None:
+                    out_row = {h: one[h] for h in ("ADO Reference", "Release", "Switch Name", "Divisions", "Value")}
+                out_row[f"{label} Status"] = one["Status"]
+                out_row[f"{label} GitXmlValue"] = one["GitXmlValue"]
+                statuses.append(f"{label}={one['Status'] if ok else one['Status'] + '/' + (one['GitXmlValue'] or '-')}")
+                summary["per_label"][label] += ok
+            is_ok = all(out_row[f"{label} Status"] == "VALIDATED" for label in labels)
+            out_row["Status"] = "VALIDATED" if is_ok else "FAILED"
+            progress(f"[{idx}/{total}] {out_row['Switch Name']}: {', '.join(statuses)}", is_ok)
+            result_w.write(out_row)
+            summary["processed"] += 1
+            summary["validated" if is_ok else "failed"] += 1
+            if on_row:
+                on_row(out_row, is_ok, "")
+    per_label = ", ".join(f"{label}: {n}/{summary['processed']}" for label, n in summary["per_label"].items())
+    progress(f"Matrix validation completed ({per_label} validated). Results saved: {result_path}", True)
+    return summary
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--worker"]:
+    sys.exit(_serve_worker())
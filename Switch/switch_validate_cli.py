@@ -0,0 +1,177 @@
+"""
+Headless FUT switch validation for CI agents and cron jobs.
+
+Runs the same validation as the "Validate" button of the Tk validator without
+importing tkinter, writing the result CSV (and optional log) into the same
+results/ and logs/ folders.
+
+    python switch_validate_cli.py --repo C:\\work\\VFUK_SIEBEL --csv release.csv --log
+
+Exit status: 0 all rows validated, 1 at least one row failed,
+2 bad arguments or input, 3 the run stopped on an error (unreadable CSV,
+git or XML worker failure), 130 cancelled.
+"""
+import os
+import sys
+import time
+import argparse
+
+from switch_engine import XmlFieldCache, check_csv_headers, run_validation, run_validation_matrix, unique_stamp
+from switch_catalog import (
+    SwitchCatalog, ValidationState, open_catalog_view, open_ref_view, open_ref_views,
+    plan_revalidation, record_validation,
+)
+from repo_meta import current_branch
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(SCRIPT_DIR, "results")
+LOGS_DIR = os.path.join(SCRIPT_DIR, "logs")
+CACHE_DIR = os.path.join(SCRIPT_DIR, "cache")
+XML_SUBDIR = os.path.join("build", "refdata", "FUT_Switch_Config")
+
+EXIT_OK = 0
+EXIT_FAILED_ROWS = 1
+EXIT_USAGE = 2
+EXIT_ERROR = 3
+EXIT_CANCELLED = 130
+EXIT_STATUS_HELP = (
+    "exit status: 0 all rows validated, 1 at least one row failed, 2 bad arguments or input, "
+    "3 the run stopped on an error, 130 cancelled"
+)
+
+
+def ts():
+    return time.strftime("%Y%m%d_%H%M%S")
+
+def report_error(e):
+    # one line for CI logs; EXIT_ERROR keeps a crash apart from failed rows
+    print(f"Validation stopped: {type(e).__name__}: {e}", file=sys.stderr)
+    return EXIT_ERROR
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Validate a switch CSV against FUT_Switch_Config XMLs.",
+                                epilog=EXIT_STATUS_HELP)
+    p.add_argument("--repo", required=True, help="Path of the Siebel git repository")
+    p.add_argument("--csv", required=True, help="Switch CSV to validate")
+    p.add_argument("--xml-dir", help=f"XML folder (default: <repo>/{XML_SUBDIR})")
+    p.add_argument("--ref", help="Validate against the XML folder at this git ref (e.g. origin/<branch>), "
+                                 "read from git objects without touching the working tree")
+    p.add_argument("--results-dir", default=RESULTS_DIR, help="Folder for the result CSV")
+    p.add_argument("--logs-dir", default=LOGS_DIR, help="Folder for the log file")
+    p.add_argument("--matrix", nargs="+", metavar="REF",
+                   help="Validate against several git refs at once into one wide result CSV")
+    p.add_argument("--log", action="store_true", help="Write a validation log file")
+    p.add_argument("--no-cache", action="store_true", help="Do not use the persistent XML cache")
+    p.add_argument("--no-catalog", action="store_true", help="Do not use the per-commit switch catalog")
+    p.add_argument("--full", action="store_true",
+                   help="Revalidate every row even if only some XMLs changed since the last run")
+    p.add_argument("-q", "--quiet", action="store_true", help="Only print failures and the summary")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    repo_path = os.path.abspath(args.repo)
+    xml_dir = os.path.abspath(args.xml_dir or os.path.join(repo_path, XML_SUBDIR))
+    if not os.path.isdir(repo_path):
+        print(f"Repository not found: {repo_path}", file=sys.stderr)
+        return EXIT_USAGE
+    if not os.path.isfile(args.csv):
+        print(f"CSV not found: {args.csv}", file=sys.stderr)
+        return EXIT_USAGE
+    if not os.path.isdir(xml_dir) and not (args.ref or args.matrix):
+        print(f"XML directory not found: {xml_dir}", file=sys.stderr)
+        return EXIT_USAGE
+    ok, msg = check_csv_headers(args.csv)
+    if not ok:
+        print(msg, file=sys.stderr)
+        return EXIT_USAGE
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    if args.log:
+        os.makedirs(args.logs_dir, exist_ok=True)
+    stamp = unique_stamp(args.results_dir, ts())
+    result_path = os.path.join(args.results_dir, f"switch_validation_result_{stamp}.csv")
+    log_path = os.path.join(args.logs_dir, f"switch_validation_log_{stamp}.log") if args.log else None
+    cache = None if args.no_cache else XmlFieldCache(os.path.join(CACHE_DIR, "xml_fields_cache.sqlite"))
+
+    def progress(line, ok=True):
+        if ok and args.quiet:
+            return
+        print(line, file=sys.stdout if ok else sys.stderr, flush=True)
+
+    if args.matrix:
+        return run_matrix(args, repo_path, xml_dir, stamp, progress)
+
+    state = ValidationState(os.path.join(CACHE_DIR, "validation_state.json"))
+    try:
+        previous = None
+        catalog_view = None
+        if args.ref:
+            catalog = SwitchCatalog(os.path.join(CACHE_DIR, "switch_catalog.sqlite"))
+            catalog_view = open_ref_view(catalog, repo_path, args.ref, xml_dir, progress=progress)
+            if catalog_view is None:
+                return EXIT_USAGE
+        elif not args.full:
+            previous = plan_revalidation(state, repo_path, args.csv, xml_dir, progress)
+        if catalog_view is None and not args.no_catalog:
+            catalog = SwitchCatalog(os.path.join(CACHE_DIR, "switch_catalog.sqlite"))
+            catalog_view = open_catalog_view(
+                catalog, repo_path, xml_dir, build=previous is None, cache=cache, progress=progress
+            )
+        summary = run_validation(
+            args.csv, xml_dir, result_path,
+            log_path=log_path,
+            log_header=(
+                f"Validation Log - {stamp}\n"
+                f"Repo: {os.path.basename(repo_path)}\n"
+                f"Branch: {args.ref or (current_branch(repo_path) if log_path else '')}\n"
+                f"XML Path: {xml_dir}\n"
+                f"Source CSV: {args.csv}\n\n"
+            ),
+            cache=cache,
+            progress=progress,
+            catalog_view=catalog_view,
+            previous=previous,
+        )
+        if not args.ref:
+            # the state tracks what HEAD was validated against, for incremental reruns
+            record_validation(state, repo_path, args.csv, xml_dir, summary)
+    except KeyboardInterrupt:
+        print("Validation cancelled.", file=sys.stderr)
+        return EXIT_CANCELLED
+    except Exception as e:
+        return report_error(e)
+
+    print(
+        f"Rows: {summary['processed']}/{summary['total']}  "
+        f"validated: {summary['validated']}  failed: {summary['failed']}  "
+        f"reused: {summary['reused']}  "
+        f"result: {result_path}"
+    )
+    if summary["cancelled"]:
+        return EXIT_CANCELLED
+    return EXIT_FAILED_ROWS if summary["failed"] else EXIT_OK
+
+def run_matrix(args, repo_path, xml_dir, stamp, progress):
+    result_path = os.path.join(args.results_dir, f"switch_validation_matrix_{stamp}.csv")
+    catalog = SwitchCatalog(os.path.join(CACHE_DIR, "switch_catalog.sqlite"))
+    try:
+        views = open_ref_views(catalog, repo_path, {ref: ref for ref in args.matrix}, xml_dir, progress=progress)
+        if len(views) != len(args.matrix):
+            return EXIT_USAGE
+        summary = run_validation_matrix(args.csv, views, result_path, progress=progress)
+    except KeyboardInterrupt:
+        print("Validation cancelled.", file=sys.stderr)
+        return EXIT_CANCELLED
+    except Exception as e:
+        return report_error(e)
+    print(
+        f"Rows: {summary['processed']}/{summary['total']}  "
+        f"validated on all: {summary['validated']}  failed: {summary['failed']}  "
+        f"result: {result_path}"
+    )
+    return EXIT_FAILED_ROWS if summary["failed"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
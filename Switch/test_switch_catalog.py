@@ -0,0 +1,118 @@
+"""
+Checks that an incremental revalidation planned by switch_catalog gives the
+same result file as a full run, rechecking only rows of changed XMLs.
+
+    python -m pytest -q test_switch_catalog.py
+"""
+import os
+import csv
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+from switch_engine import iter_csv_rows, run_validation
+from switch_catalog import ValidationState, plan_revalidation, record_validation
+
+XML_REL = os.path.join("build", "refdata", "FUT_Switch_Config")
+SWITCHES = {"Sw_Alpha": "ON", "Sw_Bravo": "OFF", "Sw_Charlie": "ON"}
+SWITCH_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?><SiebelMessage><ListOfVfFutSwitchIo><VfFutSwitchBc>'
+    "<Reference>{name}</Reference><Switch>{value}</Switch>"
+    "</VfFutSwitchBc></ListOfVfFutSwitchIo></SiebelMessage>"
+)
+
+
+class PlanRevalidationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work, ignore_errors=True)
+        self.repo = os.path.join(self.work, "repo")
+        self.xml_dir = os.path.join(self.repo, XML_REL)
+        os.makedirs(self.xml_dir)
+        self.git("init", "-q", ".")
+        for name, value in SWITCHES.items():
+            self.write_xml(name, value)
+        self.commit("switches")
+        self.csv_path = os.path.join(self.work, "release.csv")
+        with open(self.csv_path, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["ADO Reference", "Release", "Switch Name", "Divisions", "Value", "Status"])
+            for i, (name, value) in enumerate(SWITCHES.items()):
+                w.writerow([f"ADO-{i}", "R1", name, "", value, "Active"])
+        self.state = ValidationState(os.path.join(self.work, "state.json"))
+        self.runs = 0
+
+    def git(self, *args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                       cwd=self.repo, check=True, capture_output=True)
+
+    def commit(self, message):
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", message)
+
+    def write_xml(self, name, value):
+        with open(os.path.join(self.xml_dir, f"{name}.xml"), "w", encoding="utf-8") as f:
+            f.write(SWITCH_XML.format(name=name, value=value))
+
+    def validate(self, previous=None):
+        self.runs += 1
+        result_path = os.path.join(self.work, f"result_{self.runs}.csv")
+        summary = run_validation(self.csv_path, self.xml_dir, result_path, previous=previous)
+        record_validation(self.state, self.repo, self.csv_path, self.xml_dir, summary)
+        return summary
+
+    def plan(self):
+        return plan_revalidation(self.state, self.repo, self.csv_path, self.xml_dir)
+
+    def assert_same_result(self, summary):
+        full = run_validation(self.csv_path, self.xml_dir, os.path.join(self.work, "full.csv"))
+        self.assertEqual(list(iter_csv_rows(summary["result_path"])), list(iter_csv_rows(full["result_path"])))
+
+    def test_no_previous_run_means_full_run(self):
+        self.assertIsNone(self.plan())
+
+    def test_only_rows_of_committed_changes_are_rechecked(self):
+        self.assertEqual(self.validate()["validated"], 3)
+        self.write_xml("Sw_Bravo", "ON")
+        self.commit("flip bravo")
+        previous = self.plan()
+        self.assertEqual(previous["changed"], {"sw_bravo.xml"})
+        summary = self.validate(previous)
+        self.assertEqual((summary["reused"], summary["validated"], summary["failed"]), (2, 2, 1))
+        self.assert_same_result(summary)
+
+    def test_local_changes_stay_changed_until_validated_clean(self):
+        self.validate()
+        self.write_xml("Sw_Charlie", "OFF")
+        previous = self.plan()
+        self.assertEqual(previous["changed"], {"sw_charlie.xml"})
+        self.assert_same_result(self.validate(previous))
+        # reverting the edit is itself a change to the recorded run
+        self.git("checkout", "--", ".")
+        previous = self.plan()
+        self.assertEqual(previous["changed"], {"sw_charlie.xml"})
+        summary = self.validate(previous)
+        self.assertEqual(summary["failed"], 0)
+        self.assert_same_result(summary)
+        self.assertEqual(self.plan()["changed"], set())
+
+    def test_edited_csv_or_missing_result_means_full_run(self):
+        summary = self.validate()
+        with open(self.csv_path, "a", encoding="utf-8", newline="") as f:
+            f.write("ADO-9,R1,Sw_Alpha,,OFF,Active\r\n")
+        self.assertIsNone(self.plan())
+        summary = self.validate()
+        os.remove(summary["result_path"])
+        self.assertIsNone(self.plan())
+
+    def test_cancelled_run_is_not_recorded(self):
+        first = self.validate()
+        record_validation(self.state, self.repo, self.csv_path, self.xml_dir,
+                          dict(first, result_path="elsewhere.csv", cancelled=True))
+        self.assertEqual(self.plan()["result_path"], first["result_path"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Checks that the streaming early-exit reader of switch_engine returns the
+same fields as the full linearize + ElementTree parse.
+
+    python -m pytest -q test_switch_engine.py
+"""
+import io
+import random
+import unittest
+from unittest import mock
+
+import switch_engine
+from switch_engine import (
+    ALL_FIELDS, VALIDATION_FIELDS, _linear_root, _stream_fields, extract_switch_fields_from_bytes,
+    read_switch_fields,
+)
+
+TEXTS = ["ON", "OFF", "", "  padded  ", "multi\nline\ttext", "café ü€ \U0001F600",
+         "a &amp; b &lt;c&gt;", "<![CDATA[raw <x> & y]]>", "&#x41;&#66;"]
+DIVISIONS = ["FUT", "Pilot Division 1", "", "Enterprise"]
+
+
+def _ws(rng):
+    return rng.choice(["", " ", "\n", "\r\n", "\t", "\n    ", "  \n\t "])
+
+def _leaf(rng, tag, text):
+    return f"<{tag}{_ws(rng)}>{text}</{tag}{_ws(rng)}>{_ws(rng)}"
+
+def random_switch_xml(rng):
+    """A switch document in the Siebel export layout with randomized whitespace and text."""
+    children = "".join(
+        f"<VfFutSwitchChildBc{_ws(rng)}>{_leaf(rng, 'Name', d)}"
+        f"{_leaf(rng, 'Type', rng.choice(['Division', 'division', 'Channel']))}</VfFutSwitchChildBc>{_ws(rng)}"
+        for d in rng.sample(DIVISIONS, rng.randint(0, 3))
+    )
+    leaves = [(name, rng.choice(TEXTS)) for name in ("Active", "Reference", "StartDate", "Switch", "Release")]
+    rng.shuffle(leaves)
+    if rng.random() < 0.2:
+        leaves.pop()  # missing field
+    body = "".join(_leaf(rng, tag, text) for tag, text in leaves)
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>{_ws(rng)}<SiebelMessage MessageId="1-A"{_ws(rng)}>{_ws(rng)}'
+        f"<ListOfVfFutSwitchIo>{_ws(rng)}<VfFutSwitchBc>{_ws(rng)}{body}"
+        f"<ListOfVfFutSwitchChildBc>{children}</ListOfVfFutSwitchChildBc>"
+        f"</VfFutSwitchBc>{_ws(rng)}</ListOfVfFutSwitchIo>{_ws(rng)}</SiebelMessage>{_ws(rng)}"
+    ).encode("utf-8")
+
+def full_parse(data, names):
+    root_elem, _ = _linear_root(data.decode("utf-8"))
+    fields = read_switch_fields(root_elem)
+    return {n: fields[n] for n in names}
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class StreamFieldsTest(unittest.TestCase):
+
+    def test_matches_full_parse(self):
+        rng = random.Random(6)
+        for _ in range(300):
+            data = random_switch_xml(rng)
+            for names in (VALIDATION_FIELDS, ALL_FIELDS):
+                expected = full_parse(data, names)
+                for chunk in (1, 2, 3, 7, 64, switch_engine.STREAM_CHUNK):
+                    with mock.patch.object(switch_engine, "STREAM_CHUNK", chunk):
+                        self.assertEqual(_stream_fields(io.BytesIO(data), names), expected, (chunk, data))
+
+    def test_stops_reading_once_fields_are_found(self):
+        head = random_switch_xml(random.Random(1))
+        data = head.replace(b"</SiebelMessage>", b"<Pad>" + b"x " * 200000 + b"</Pad></SiebelMessage>")
+        f = CountingReader(data)
+        _stream_fields(f, VALIDATION_FIELDS)
+        self.assertLess(f.bytes_read, 2 * switch_engine.STREAM_CHUNK)
+        hashed = CountingReader(data)
+        _stream_fields(hashed, VALIDATION_FIELDS, switch_engine.hashlib.sha1())
+        self.assertEqual(hashed.bytes_read, len(data))
+
+    def test_malformed_document_reports_full_parse_error(self):
+        ok, err = extract_switch_fields_from_bytes(b"<SiebelMessage><ListOf", "Switch_X.xml", VALIDATION_FIELDS)
+        self.assertFalse(ok)
+        self.assertTrue(err.startswith("XML parse error in Switch_X.xml: "))
+
+
+if __name__ == "__main__":
+    unittest.main()
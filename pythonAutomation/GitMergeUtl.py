@@ -1,12 +1,20 @@
 import streamlit as st
 from git import Repo, GitCommandError
-import pandas as pd
 import os
 import json
-from datetime import datetime
+import time
+
+from merge_report import (
+    BATCH_COLUMNS, PAGE_SIZE, REPORT_COLUMNS, MergeReportCache, read_report_page, report_rows, run_batch,
+    write_report_csv,
+)
 
 # Load paths from config
 CONFIG_FILE = 'merge_paths_config.json'
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT_CACHE_DIR = os.path.join(SCRIPT_DIR, 'cache', 'merge_reports')
+RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
+DOWNLOAD_MAX_BYTES = 100 * 1024 * 1024  # larger reports are only saved under results/
 
 def load_paths(config_file):
     if not os.path.exists(config_file):
@@ -14,6 +22,25 @@ def load_paths(config_file):
     with open(config_file, 'r') as f:
         return json.load(f).get("paths", [])
 
+def load_pairs(config_file):
+    """
+    Branch pairs for the batch report; a pair without "paths" uses every
+    configured path. See merge_paths_config.example.json for the layout.
+    """
+    if not os.path.exists(config_file):
+        return []
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    return [
+        {'from': p['from'], 'to': p['to'], 'paths': p.get('paths') or config.get("paths", [])}
+        for p in config.get("pairs", [])
+    ]
+
+@st.cache_resource
+def report_cache():
+    # one instance across Streamlit reruns, shared by the batch workers
+    return MergeReportCache(REPORT_CACHE_DIR)
+
 # UI
 st.title("🔀 Git Merge Report Generator (Path-Specific)")
 
@@ -27,6 +54,7 @@ available_paths = load_paths(CONFIG_FILE)
 selected_paths = st.multiselect("📂 Select Paths to Compare", available_paths)
 
 if st.button("📊 Generate Merge Report"):
+    st.session_state.pop('merge_report', None)
     if not os.path.isdir(repo_path):
         st.error("Invalid repository path.")
     elif not selected_paths:
@@ -37,41 +65,76 @@ if st.button("📊 Generate Merge Report"):
             if repo.bare:
                 st.error("The repository is bare.")
             else:
-                commits = list(repo.iter_commits(f'{branch_to}..{branch_from}'))
-                filtered_commits = [
-                    c for c in commits
-                    if start_date <= datetime.fromtimestamp(c.committed_date).date() <= end_date
-                ]
-
-                report_data = []
-                for commit in filtered_commits:
-                    for file in commit.stats.files:
-                        if any(file.startswith(path) for path in selected_paths):
-                            object_name = os.path.basename(file)
-                            report_data.append({
-                                'Filename': file,
-                                'Object Name': object_name,
-                                'Commit Message': commit.message.strip(),
-                                'Author': commit.author.name,
-                                'Commit Hash': commit.hexsha
-                            })
-
-                if not report_data:
-                    st.info("No changes found in the selected paths and date range.")
-                else:
-                    df = pd.DataFrame(report_data)
-                    st.success(f"Found {len(df)} changes.")
-                    st.dataframe(df)
-
-                    csv = df.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label="📥 Download CSV",
-                        data=csv,
-                        file_name='merge_report_filtered.csv',
-                        mime='text/csv'
-                    )
+                commits = report_cache().commits(
+                    repo, branch_from, branch_to, selected_paths, start_date, end_date
+                )
+                os.makedirs(RESULTS_DIR, exist_ok=True)
+                csv_path = os.path.join(RESULTS_DIR, f"merge_report_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+                rows = report_rows(commits, selected_paths, start_date, end_date)
+                count, offsets = write_report_csv(rows, csv_path)
+                if commits.source != 'walked':
+                    st.caption(f"History: {commits.source} ({commits.count} commits)")
+                st.session_state['merge_report'] = {
+                    'path': csv_path, 'rows': count, 'offsets': offsets, 'columns': REPORT_COLUMNS
+                }
 
         except GitCommandError as e:
             st.error(f"Git error: {e}")
         except Exception as e:
             st.error(f"Error: {e}")
+
+batch_pairs = load_pairs(CONFIG_FILE)
+if batch_pairs:
+    st.subheader("🧮 Batch Report")
+    st.caption(f"{len(batch_pairs)} branch pair(s) from {CONFIG_FILE}, using the dates above.")
+    if st.button("📊 Generate Batch Report"):
+        st.session_state.pop('merge_report', None)
+        if not os.path.isdir(repo_path):
+            st.error("Invalid repository path.")
+        else:
+            try:
+                repo = Repo(repo_path)
+                if repo.bare:
+                    st.error("The repository is bare.")
+                else:
+                    os.makedirs(RESULTS_DIR, exist_ok=True)
+                    csv_path = os.path.join(RESULTS_DIR, f"merge_report_batch_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+                    t0 = time.perf_counter()
+                    summaries, count, offsets = run_batch(
+                        repo, batch_pairs, start_date, end_date, csv_path, cache=report_cache()
+                    )
+                    st.session_state['merge_report'] = {
+                        'path': csv_path, 'rows': count, 'offsets': offsets, 'columns': BATCH_COLUMNS,
+                        'summaries': summaries, 'seconds': round(time.perf_counter() - t0, 3),
+                    }
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+# The report lives on disk; every rerun (page change, download) previews one page of it.
+report = st.session_state.get('merge_report')
+if report:
+    if report.get('summaries'):
+        st.write(f"Batch finished in {report['seconds']}s")
+        st.dataframe([
+            {'From': r['from'], 'To': r['to'], 'Paths': ', '.join(r['paths']), 'Commits': r['commits'],
+             'Changes': r['changes'], 'History': r['source'], 'Seconds': r['seconds'], 'Error': r['error']}
+            for r in report['summaries']
+        ])
+    if not report['rows']:
+        st.info("No changes found in the selected paths and date range.")
+    elif os.path.isfile(report['path']):
+        st.success(f"Found {report['rows']} changes.")
+        pages = len(report['offsets'])
+        page = st.number_input(f"Page (of {pages}, {PAGE_SIZE} rows each)", min_value=1, max_value=pages, value=1)
+        st.dataframe(read_report_page(report['path'], report['offsets'], page - 1, columns=report['columns']))
+
+        if os.path.getsize(report['path']) <= DOWNLOAD_MAX_BYTES:
+            with open(report['path'], 'rb') as f:
+                st.download_button(
+                    label="📥 Download CSV",
+                    data=f,
+                    file_name=os.path.basename(report['path']) if report.get('summaries') else 'merge_report_filtered.csv',
+                    mime='text/csv'
+                )
+        else:
+            st.info(f"Report too large to download in the browser; saved to {report['path']}")
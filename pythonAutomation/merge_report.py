@@ -0,0 +1,389 @@
+"""
+Merge report engine for GitMergeUtl.py.
+
+Commits, authors, messages and touched paths of a branch range come from one
+streamed `git log --name-only` instead of GitPython's commit.stats, which runs
+a separate `git diff` per commit. The output is parsed as it arrives, so the
+report never holds the raw log in memory.
+
+Touched paths match commit.stats.files: the diff against the first parent
+(merges included), without rename detection.
+
+The date window and the selected paths are handed to git (--since/--until and
+pathspecs), so history outside them is skipped by git instead of being parsed
+and discarded here.
+
+MergeReportCache keeps walked ranges on disk, keyed by the resolved SHAs of
+both branches, the date window and the path set. When only the "from" branch
+moved forward, only the commits added since are walked.
+
+Commits flow from git (or the cache file) through the row filter into the
+CSV one at a time, the cache entry being written alongside; the app previews
+the report a page at a time from the file, so memory does not grow with the
+range or the report.
+
+run_batch walks many (from, to, paths) pairs concurrently against the same
+repository and streams them into one combined report.
+"""
+import os
+import csv
+import glob
+import json
+import time
+import hashlib
+import itertools
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from git import GitCommandError
+
+REPORT_COLUMNS = ['Filename', 'Object Name', 'Commit Message', 'Author', 'Commit Hash']
+BATCH_COLUMNS = ['From Branch', 'To Branch'] + REPORT_COLUMNS
+
+# record: \x1e<sha>\x1f<author>\x1f<commit time>\x1f<message>\0\n<path>\0<path>\0...
+LOG_FORMAT = '%x1e%H%x1f%an%x1f%ct%x1f%B'
+LOG_ARGS = ('-z', '--name-only', '--no-renames', '--diff-merges=first-parent', f'--format={LOG_FORMAT}')
+CHUNK_SIZE = 1 << 16
+PAGE_SIZE = 500
+PATHSPEC_SPECIAL = '*?[\\'
+
+Commit = namedtuple('Commit', 'hexsha author committed_date message files')
+
+
+def _parse_record(record):
+    header, _, names = record.partition(b'\0')
+    sha, author, ctime, message = header.split(b'\x1f', 3)
+    files = [n.decode('utf-8', 'replace') for n in names.lstrip(b'\n').split(b'\0') if n]
+    return Commit(
+        sha.decode('ascii'),
+        author.decode('utf-8', 'replace'),
+        int(ctime),
+        message.decode('utf-8', 'replace').strip(),
+        files,
+    )
+
+def path_prefix_spec(path):
+    """Pathspec matching every path that starts with `path`, like str.startswith."""
+    escaped = ''.join('\\' + c if c in PATHSPEC_SPECIAL else c for c in path)
+    return escaped + '*'
+
+def log_limits(paths=(), start_date=None, end_date=None):
+    """git log options and pathspecs for a local-time date window and path prefixes."""
+    args = []
+    if start_date:
+        args.append(f'--since={start_date.isoformat()} 00:00:00')
+    if end_date:
+        args.append(f'--until={end_date.isoformat()} 23:59:59')
+    if paths:
+        # keep merges that bring a path in from their second parent, like an unfiltered walk would
+        args.append('--full-history')
+    return args, [path_prefix_spec(p) for p in paths]
+
+def iter_commits(repo, rev_range, paths=(), start_date=None, end_date=None):
+    """
+    Yield Commit tuples for rev_range (e.g. 'release..feature', or a list of
+    rev arguments such as [new_sha, '^' + old_sha]), newest first
+    like repo.iter_commits, limited to commits touching one of the path
+    prefixes and committed within the dates. Only the paths under those
+    prefixes are listed. Raises GitCommandError when git fails.
+    """
+    limits, pathspecs = log_limits(paths, start_date, end_date)
+    revs = [rev_range] if isinstance(rev_range, str) else list(rev_range)
+    proc = repo.git.log(*revs, *LOG_ARGS, *limits, '--', *pathspecs, as_process=True)
+    pending = b''
+    try:
+        while True:
+            chunk = proc.stdout.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            records = (pending + chunk).split(b'\x1e')
+            pending = records.pop()
+            for record in records:
+                if record:
+                    yield _parse_record(record)
+        if pending:
+            yield _parse_record(pending)
+    finally:
+        proc.stdout.close()
+    proc.wait()
+
+def report_rows(commits, selected_paths, start_date, end_date):
+    """
+    Report rows (dicts keyed by REPORT_COLUMNS) for the commits and files in
+    scope. Git already limits both; the checks here keep the exact local-date
+    and prefix semantics when git's --since cut-off meets skewed commit dates.
+    """
+    prefixes = tuple(selected_paths)
+    for commit in commits:
+        if not start_date <= datetime.fromtimestamp(commit.committed_date).date() <= end_date:
+            continue
+        for file in commit.files:
+            if file.startswith(prefixes):
+                yield {
+                    'Filename': file,
+                    'Object Name': os.path.basename(file),
+                    'Commit Message': commit.message,
+                    'Author': commit.author,
+                    'Commit Hash': commit.hexsha,
+                }
+
+
+def write_report_csv(rows, csv_path, page_size=PAGE_SIZE, columns=REPORT_COLUMNS):
+    """
+    Stream report rows into csv_path. Returns (row count, file offsets of
+    the first row of every page) for read_report_page.
+    """
+    count = 0
+    offsets = []
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            if count % page_size == 0:
+                offsets.append(f.tell())
+            writer.writerow([row[c] for c in columns])
+            count += 1
+    return count, offsets
+
+def read_report_page(csv_path, offsets, page, page_size=PAGE_SIZE, columns=REPORT_COLUMNS):
+    """Rows (dicts keyed by columns) of one 0-based page of a written report."""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        f.seek(offsets[page])
+        return [dict(zip(columns, r)) for r in itertools.islice(csv.reader(f), page_size)]
+
+
+# ----------------------------- Report cache -----------------------------
+CACHE_VERSION = 2
+
+def resolve_commit(repo, ref):
+    """Full SHA of the commit `ref` points to; GitCommandError for an unknown ref."""
+    return repo.git.rev_parse('--verify', f'{ref}^{{commit}}').strip()
+
+def _is_ancestor(repo, old_sha, new_sha):
+    try:
+        repo.git.merge_base('--is-ancestor', old_sha, new_sha)
+        return True
+    except GitCommandError:
+        return False
+
+
+class CommitStream:
+    """Commits of one range, read lazily; count is the number yielded so far."""
+
+    def __init__(self, commits, source):
+        self.source = source
+        self.count = 0
+        self._commits = commits
+
+    def __iter__(self):
+        try:
+            for commit in self._commits:
+                self.count += 1
+                yield commit
+        finally:
+            # a reader that stops early must not leave a half-written cache entry behind
+            close = getattr(self._commits, 'close', None)
+            if close:
+                close()
+
+
+class MergeReportCache:
+    """
+    Commits of walked ranges per (from SHA, to SHA, date window, path set),
+    kept as JSON lines files in cache_dir, up to max_entries with the least
+    recently used removed first. Entries are written while the walk streams
+    and read back line by line, so no range is ever held in memory.
+    Safe to share between threads.
+    """
+
+    def __init__(self, cache_dir, max_entries=50):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scope(to_sha, paths, start_date, end_date):
+        # everything but the "from" SHA, so a moved branch finds its older walks
+        text = '|'.join([to_sha, str(start_date or ''), str(end_date or '')] + sorted(paths))
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+    def _path(self, scope, from_sha):
+        return os.path.join(self.cache_dir, f'{scope}_{from_sha}.jsonl')
+
+    @staticmethod
+    def _open(path):
+        """The entry file positioned after its header, or None if missing or stale."""
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except OSError:
+            return None
+        try:
+            if json.loads(f.readline()).get('version') == CACHE_VERSION:
+                return f
+        except ValueError:
+            pass
+        f.close()
+        return None
+
+    @staticmethod
+    def _read(f):
+        with f:
+            for line in f:
+                yield Commit(*json.loads(line))
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _trim(self):
+        with self._lock:
+            entries = sorted(glob.glob(os.path.join(self.cache_dir, '*.jsonl')), key=os.path.getmtime)
+            for old in entries[:-self.max_entries]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def _recorded(self, path, commits):
+        """Yield commits while writing them to path; the entry only appears once the walk completed."""
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        f = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            f = open(tmp, 'w', encoding='utf-8')
+            f.write(json.dumps({'version': CACHE_VERSION}) + '\n')
+        except OSError:
+            if f is not None:
+                f.close()
+                os.remove(tmp)
+            f = None
+        complete = False
+        try:
+            for commit in commits:
+                if f is not None:
+                    try:
+                        f.write(json.dumps(commit, separators=(',', ':')) + '\n')
+                    except OSError:
+                        f.close()
+                        f = None
+                yield commit
+            complete = True
+        finally:
+            if f is not None:
+                f.close()
+                try:
+                    if complete:
+                        os.replace(tmp, path)
+                        self._trim()
+                    else:
+                        os.remove(tmp)
+                except OSError:
+                    pass
+
+    def _base_for(self, repo, scope, from_sha):
+        """An earlier walk of the same scope whose "from" SHA is an ancestor of from_sha, opened."""
+        candidates = glob.glob(os.path.join(self.cache_dir, f'{scope}_*.jsonl'))
+        for path in sorted(candidates, key=os.path.getmtime, reverse=True):
+            old_sha = os.path.basename(path)[len(scope) + 1:-len('.jsonl')]
+            if _is_ancestor(repo, old_sha, from_sha):
+                f = self._open(path)
+                if f is not None:
+                    return old_sha, f
+        return None, None
+
+    def commits(self, repo, branch_from, branch_to, paths=(), start_date=None, end_date=None):
+        """
+        CommitStream of branch_to..branch_from limited to paths and dates,
+        newest first; its source says how the commits are obtained: 'cached',
+        'incremental' or 'walked'. Refs are resolved here, the walk happens as
+        the stream is read.
+        """
+        from_sha = resolve_commit(repo, branch_from)
+        to_sha = resolve_commit(repo, branch_to)
+        scope = self._scope(to_sha, paths, start_date, end_date)
+        path = self._path(scope, from_sha)
+        f = self._open(path)
+        if f is not None:
+            self._touch(path)
+            return CommitStream(self._read(f), 'cached')
+        old_sha, old_file = self._base_for(repo, scope, from_sha)
+        if old_file is not None:
+            new_commits = iter_commits(repo, [from_sha, '^' + to_sha, '^' + old_sha], paths, start_date, end_date)
+            commits, source = itertools.chain(new_commits, self._read(old_file)), 'incremental'
+        else:
+            commits, source = iter_commits(repo, [from_sha, '^' + to_sha], paths, start_date, end_date), 'walked'
+        return CommitStream(self._recorded(path, commits), source)
+
+
+# ----------------------------- Batch -----------------------------
+def _walk_pair(repo, pair, start_date, end_date, cache, part_path):
+    """Write the rows of one pair to part_path as it is walked; returns its summary."""
+    t0 = time.perf_counter()
+    summary = {'from': pair['from'], 'to': pair['to'], 'paths': list(pair['paths']),
+               'commits': 0, 'changes': 0, 'source': '', 'seconds': 0.0, 'error': ''}
+    with open(part_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        try:
+            if cache is not None:
+                commits = cache.commits(repo, pair['from'], pair['to'], pair['paths'], start_date, end_date)
+            else:
+                commits = CommitStream(iter_commits(
+                    repo, f"{pair['to']}..{pair['from']}", pair['paths'], start_date, end_date
+                ), 'walked')
+            for row in report_rows(commits, summary['paths'], start_date, end_date):
+                row['From Branch'] = summary['from']
+                row['To Branch'] = summary['to']
+                writer.writerow([row[c] for c in BATCH_COLUMNS])
+                summary['changes'] += 1
+            summary['commits'] = commits.count
+            summary['source'] = commits.source
+        except GitCommandError as e:
+            # git fails at the end of the walk; keep no half-written rows for the pair
+            f.seek(0)
+            f.truncate()
+            summary['changes'] = 0
+            # e.stderr reads "\n  stderr: 'fatal: ...'"
+            summary['error'] = (e.stderr or '').strip().replace("stderr: ", "", 1).strip("'") or str(e)
+    summary['seconds'] = round(time.perf_counter() - t0, 3)
+    return summary
+
+def run_batch(repo, pairs, start_date, end_date, csv_path, cache=None, workers=None):
+    """
+    Walk every pair ({'from', 'to', 'paths'}) on a pool of workers sharing the
+    repository. Each walk streams its rows into a part file next to csv_path;
+    the parts are copied into one CSV with BATCH_COLUMNS in pair order, so the
+    report is the same on every run and no pair is held in memory. A pair git
+    cannot resolve gets an 'error' in its summary instead of stopping the
+    batch. Returns (per-pair summaries in input order, row count, page offsets).
+    """
+    summaries = [None] * len(pairs)
+    workers = workers or min(len(pairs), os.cpu_count() or 1, 8)
+    parts = [f'{csv_path}.part{i}' for i in range(len(pairs))]
+
+    def rows():
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [
+                pool.submit(_walk_pair, repo, pair, start_date, end_date, cache, parts[i])
+                for i, pair in enumerate(pairs)
+            ]
+            # later pairs keep walking into their parts while an earlier one is copied
+            for i, fut in enumerate(futures):
+                summaries[i] = fut.result()
+                with open(parts[i], 'r', encoding='utf-8', newline='') as f:
+                    for r in csv.reader(f):
+                        yield dict(zip(BATCH_COLUMNS, r))
+
+    try:
+        count, offsets = write_report_csv(rows(), csv_path, columns=BATCH_COLUMNS)
+    finally:
+        for part in parts:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+    return summaries, count, offsets
@@ -0,0 +1,107 @@
+"""
+Checks that MergeReportCache hands back the same commits as a fresh walk,
+whether they come from git, the cache file or an incremental walk, and that
+run_batch writes its pairs in config order.
+
+    python -m pytest -q test_merge_report.py
+"""
+import os
+import csv
+import shutil
+import tempfile
+import subprocess
+import unittest
+from datetime import date
+
+from git import Repo
+
+from merge_report import MergeReportCache, iter_commits, report_rows, run_batch
+
+PATHS = ["src/module1", "lib/utils"]
+# git's date parser stops at 2099
+START, END = date(2000, 1, 1), date(2099, 12, 31)
+
+
+class MergeReportCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work, ignore_errors=True)
+        self.path = os.path.join(self.work, "repo")
+        os.makedirs(self.path)
+        self.git("init", "-q", "-b", "release", ".")
+        self.change("base", "src/module1/a.txt")
+        self.git("switch", "-q", "-c", "feature")
+        self.step = 0
+        self.advance(12)
+        self.repo = Repo(self.path)
+        self.addCleanup(self.repo.close)
+        self.cache = MergeReportCache(os.path.join(self.work, "cache"))
+        self.assertGreater(len(self.fresh()), 3)
+
+    def git(self, *args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                       cwd=self.path, check=True, capture_output=True)
+
+    def change(self, message, *files):
+        for name in files:
+            full = os.path.join(self.path, name)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "a", encoding="utf-8") as f:
+                f.write(message + "\n")
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", message)
+
+    def advance(self, commits):
+        folders = ["src/module1", "src/module2", "lib/utils", "other"]
+        for _ in range(commits):
+            self.step += 1
+            self.change(f"change {self.step}", f"{folders[self.step % 4]}/f{self.step % 3}.txt",
+                        f"{folders[(self.step + 1) % 4]}/g.txt")
+
+    def fresh(self):
+        return list(iter_commits(self.repo, "release..feature", PATHS, START, END))
+
+    def cached(self):
+        stream = self.cache.commits(self.repo, "feature", "release", PATHS, START, END)
+        return list(stream), stream.source
+
+    def test_walked_then_cached(self):
+        self.assertEqual(self.cached(), (self.fresh(), "walked"))
+        self.assertEqual(self.cached(), (self.fresh(), "cached"))
+
+    def test_incremental_walk_matches_fresh_walk(self):
+        self.cached()
+        self.advance(7)
+        commits, source = self.cached()
+        self.assertEqual(source, "incremental")
+        self.assertEqual(commits, self.fresh())
+        self.assertEqual(self.cached(), (self.fresh(), "cached"))
+
+    def test_abandoned_walk_is_not_cached(self):
+        stream = self.cache.commits(self.repo, "feature", "release", PATHS, START, END)
+        for _ in stream:
+            break
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+        self.assertEqual(self.cached()[1], "walked")
+
+    def test_batch_rows_follow_pair_order(self):
+        pairs = [{"from": f"feature~{n}", "to": "release", "paths": PATHS} for n in (6, 0, 3)]
+        pairs.insert(1, {"from": "missing", "to": "release", "paths": PATHS})
+        csv_path = os.path.join(self.work, "batch.csv")
+        expected = []
+        for pair in pairs[:1] + pairs[2:]:
+            commits = iter_commits(self.repo, f"release..{pair['from']}", PATHS, START, END)
+            expected += [(pair["from"], r["Commit Hash"], r["Filename"]) for r in report_rows(commits, PATHS, START, END)]
+        for cache in (None, self.cache, self.cache):
+            summaries, count, _ = run_batch(self.repo, pairs, START, END, csv_path, cache=cache, workers=4)
+            with open(csv_path, encoding="utf-8", newline="") as f:
+                rows = [(r["From Branch"], r["Commit Hash"], r["Filename"]) for r in csv.DictReader(f)]
+            self.assertEqual(rows, expected)
+            self.assertEqual(count, len(expected))
+            self.assertTrue(summaries[1]["error"])
+        self.assertEqual([p for p in os.listdir(self.work) if ".part" in p], [])
+
+
+if __name__ == "__main__":
+    unittest.main()